@@ -1,3 +1,4 @@
+import logging
 import streamlit as st
 from app.st_components.home import show_home
 from app.st_components.upload_cv import show_upload_cv
@@ -8,6 +9,9 @@ from app.st_components.simple_rag_interface import show_simple_rag_interface, sh
 # Import your database and neo4j services
 from app.services.neo4j_service import Neo4jService
 
+# Root logging is configured once here; service modules only create their own loggers
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
 def main():
     # Set page config
     st.set_page_config(
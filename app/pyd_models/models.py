@@ -84,6 +84,12 @@ class ResponseSkills(BaseModel):
     skills: List[SkillEntity] = []
 
 
+class ResponseCVData(BaseModel):
+    person: PersonEntity
+    experiences: ResponseExperiences = ResponseExperiences()
+    skills: ResponseSkills = ResponseSkills()
+
+
 class SkillRequirement(BaseModel):
     name: str
     importance: Literal["required", "preferred", "nice-to-have"] = "required"
@@ -8,8 +8,6 @@ from app.services.data_extraction_service import DataExtractionService
 from app.services.neo4j_service import Neo4jService
 from app.utils.file_utils import read_cv_text
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class CVProcessorService:
@@ -100,18 +98,68 @@ class CVProcessorService:
         Returns:
             Number of processed CVs
         """
-        processed = 0
+        # Drain the queue and read every CV first so identical texts can share one extraction
+        batch = []
+        warm_up = None
         while not self.cv_queue.empty():
             try:
                 original_filename, unique_filename, file_path = self.cv_queue.get_nowait()
-                success = await self.process_cv(file_path, unique_filename, original_filename)
-                if success:
-                    processed += 1
+                display_name = original_filename or unique_filename
+                cv_text = await read_cv_text(file_path)
+                if cv_text:
+                    batch.append((cv_text, unique_filename))
+                    if warm_up is None:
+                        # Establish the Azure connections while the remaining CV files are read,
+                        # only once there is something to extract
+                        warm_up = asyncio.create_task(self.data_extraction_service.warm_up())
+                else:
+                    logger.error(f"Failed to read text from CV: {display_name}")
             except Exception as e:
                 logger.error(f"Error in process_all_cvs: {e}")
             finally:
                 self.cv_queue.task_done()
         
+        if not batch:
+            return 0
+        
+        processed = 0
+        try:
+            await warm_up
+            all_cv_data = await self.data_extraction_service.extract_cv_data_batch(batch)
+        except Exception as e:
+            logger.error(f"Error in process_all_cvs: {e}", exc_info=True)
+            return processed
+        finally:
+            # The connections belong to this run's event loop, which the next run does not share
+            await self.data_extraction_service.aclose()
+        
+        # CVs whose extraction failed are reported and left out, so they cannot fail the others
+        extracted = []
+        for (_, cv_filename), cv_data in zip(batch, all_cv_data):
+            if cv_data.get("extraction_failed"):
+                logger.error(f"Skipping candidate {cv_filename}: data extraction failed")
+            else:
+                extracted.append((cv_filename, cv_data))
+        if not extracted:
+            return processed
+        
+        # Store the CVs in batches off the event loop
+        try:
+            results = await asyncio.to_thread(
+                self.neo4j_service.add_candidates,
+                [self._candidate_row(cv_filename, cv_data) for cv_filename, cv_data in extracted]
+            )
+        except Exception as e:
+            logger.error(f"Error in process_all_cvs: {e}", exc_info=True)
+            return processed
+        
+        for (cv_filename, _), success in zip(extracted, results):
+            if success:
+                logger.info(f"Successfully added candidate {cv_filename} to Neo4j")
+                processed += 1
+            else:
+                logger.error(f"Failed to add candidate {cv_filename} to Neo4j")
+        
         return processed
     
     async def process_cv(self, cv_path: str, cv_filename: str, original_filename: Optional[str] = None) -> bool:
@@ -127,33 +175,43 @@ class CVProcessorService:
                 return False
             
             # Extract structured data from CV
-            # Note: This assumes extract_cv_data has a synchronous version
             cv_data = await self.data_extraction_service.extract_cv_data(cv_text, cv_filename)
             logger.info(f"The extraction is successful. Data: {cv_data}")
             
-            # Generate a unique candidate ID based on filename
-            candidate_id = os.path.splitext(cv_filename)[0]
-            logger.info(f"Generated candidate ID: {candidate_id}")
-            
-            # Add candidate to Neo4j
-            success = self.neo4j_service.add_candidate(
-                candidate_id=candidate_id,
-                person_data=cv_data['person'],
-                experiences=cv_data['experiences'],
-                skills=cv_data['skills']
-            )
-            
-            if success:
-                logger.info(f"Successfully added candidate {cv_filename} to Neo4j")
-            else:
-                logger.error(f"Failed to add candidate {cv_filename} to Neo4j")
-            
-            return success
+            return self._store_cv(cv_filename, cv_data)
                 
         except Exception as e:
             logger.error(f"Error processing CV {display_name}: {e}", exc_info=True)
             return False
     
+    def _candidate_row(self, cv_filename: str, cv_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the add_candidate arguments for the extracted data of a CV"""
+        # Generate a unique candidate ID based on filename
+        candidate_id = os.path.splitext(cv_filename)[0]
+        logger.info(f"Generated candidate ID: {candidate_id}")
+        
+        return {
+            "candidate_id": candidate_id,
+            "person_data": cv_data['person'],
+            "experiences": cv_data['experiences'],
+            "skills": cv_data['skills']
+        }
+    
+    def _store_cv(self, cv_filename: str, cv_data: Dict[str, Any]) -> bool:
+        """Add the extracted data of a CV to Neo4j"""
+        if cv_data.get("extraction_failed"):
+            logger.error(f"Skipping candidate {cv_filename}: data extraction failed")
+            return False
+        
+        success = self.neo4j_service.add_candidate(**self._candidate_row(cv_filename, cv_data))
+        
+        if success:
+            logger.info(f"Successfully added candidate {cv_filename} to Neo4j")
+        else:
+            logger.error(f"Failed to add candidate {cv_filename} to Neo4j")
+        
+        return success
+    
     def shutdown(self) -> None:
         """Stop the processor service"""
         self.is_processing = False
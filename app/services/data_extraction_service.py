@@ -1,158 +1,519 @@
+import asyncio
 import logging
 import os
 import re
+import json
+import hashlib
+import functools
+import itertools
+import weakref
 from string import Template
+from typing import Dict, List, Optional, Tuple
+import httpx
+import openai
+import tiktoken
 from dotenv import load_dotenv
+from json_repair import repair_json
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.output_parsers.openai_tools import PydanticToolsParser
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_openai import AzureChatOpenAI
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from app.services import extraction_cache
 from app.pyd_models.models import (
-    PersonEntity,
     PersonEntityWithMetadata,
     ResponseSkills,
     ResponseExperiences,
+    ResponseCVData,
     JobPostingData,
-    EducationEntity,
 )
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Runs of non-ASCII characters are collapsed to a single space before extraction
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7F]+')
 
+# Extra attempts when the model's output does not validate against the schema
+_MAX_VALIDATION_RETRIES = 2
 
+# Transient API errors retried by _call_llm (the clients themselves do not retry)
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)
 
+# SDK retry count for the direct Batch API calls, the OpenAI client's default
+_SDK_MAX_RETRIES = 2
 
-class DataExtractionService:
-    def __init__(self):
-        """Initialize the data extraction service with LangChain AzureChatOpenAI client"""
-        self.langchain_model = AzureChatOpenAI(
-            azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
-            openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            temperature=0
+# Errors that move a request on to the next Azure deployment
+_FALLBACK_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Part of every extraction cache key, so entries written for an older CV schema are never read back
+_CV_SCHEMA_TAG = json.dumps(ResponseCVData.schema(), sort_keys=True)
+
+# Per-CV user message, compiled once; the instructions live in the static system messages
+_CV_MESSAGE_TPL = Template("""Resume text:
+$ctext
+""")
+
+# Static extraction instructions, built once at import and shared by every service instance.
+# They are sent as system messages and kept byte-identical so the provider's prompt cache can hit.
+_CANDIDATE_SYS = SystemMessage(content="""From the Resume text in the user message, extract person information with consistent formatting.
+
+You MUST extract the list of following fields exactly as specified:
+- id: Generate a unique identifier based on the name (e.g., "person_john_smith")
+- name: Full name of the candidate (lowercase)
+- job_title: Current professional role/title (lowercase)
+- description: Brief summary of background and specialization (1-2 sentences, max 100 characters, lowercase)
+- location_city: Extract the candidate's current city location (lowercase, e.g., "new york", "san francisco")
+- has_degrees: A list of education entries, each containing:
+  - university: Name of the university or institution (lowercase)
+  - degree: MUST be EXACTLY one of these values only: "bachelor", "master", "phd", or "any" if unclear
+  - field_of_study: The field or major of study (e.g., "computer science", "business") (lowercase)
+  - graduation_year: Year of graduation as a 4-digit integer (between 1900-2100, estimate if unclear)
+  - alternative_fields: List of alternative fields of study (e.g., ["information technology", "software engineering"])
+
+IMPORTANT:
+1. ALL text values MUST be lowercase
+2. Do NOT include position or skill information
+3. Use "any" for degree ONLY if the degree level cannot be determined
+4. Ensure all fields are filled with appropriate values
+5. For alternative_fields, include at least 2-3 closely related fields as a proper JSON array
+6. No matter what language the CV is in, the output MUST be in English
+7. If graduation_year cannot be determined, use the current year or estimate based on experience
+8. For location_city, extract only the city name, not country or state. If not found, leave empty
+""")
+
+_EXPERIENCE_SYS = SystemMessage(content="""From the Resume text in the user message, extract ALL work experience information with consistent formatting.
+For EACH position, extract the following fields exactly:
+- job_title: The position title (lowercase)
+- alternative_job_titles: Comma-separated list of similar job titles that would qualify (lowercase, e.g., "software developer, software engineer, programmer")
+- company_name: Name of the employer/company (lowercase)
+- experience_in_years: Number of years in this position as an INTEGER (must be non-negative)
+- description: Brief summary of responsibilities or achievements (1-2 sentences, lowercase)
+
+IMPORTANT:
+1. ALL text values MUST be lowercase
+2. Extract ALL positions/jobs mentioned in the resume
+3. Calculate experience_in_years based on start/end dates (round to nearest year)
+4. If exact dates aren't available, provide your best estimate
+5. experience_in_years MUST be a non-negative integer (0 if unclear)
+6. For alternative_job_titles, provide at least 3 most related alternative job titles
+7. No matter what language the CV is in, the output MUST be in English
+""")
+
+_SKILLS_SYS = SystemMessage(content="""From the Resume text in the user message, extract ALL professional skills with consistent formatting.
+
+For EACH skill, extract the following fields exactly:
+- name: The specific skill name (lowercase, keep meaningful phrases together)
+- alternative_names: Comma-separated list of related skills, variations, or technologies (lowercase, e.g., "react.js, reactjs, react native")
+- level: MUST be EXACTLY one of: "beginner", "intermediate", "advanced", or "expert"
+- years_experience: Number of years using this skill as an INTEGER (must be non-negative)
+
+IMPORTANT:
+1. ALL text values MUST be lowercase
+2. Extract EVERY technical and professional skill mentioned
+3. Infer skill levels using these guidelines:
+- beginner: Basic understanding, minimal practical experience
+- intermediate: Regular usage, comfortable with common applications
+- advanced: Deep knowledge, can solve complex problems, 3+ years typical experience
+- expert: Mastery level, can teach others, 5+ years typical experience
+4. If years_experience is mentioned, use that exact value; otherwise infer based on:
+- Recent graduates/entry positions: 0-1 years
+- Mid-level positions: 2-4 years
+- Senior positions: 5+ years
+5. Keep meaningful compound skills together (e.g., "project management", "digital marketing")
+6. For alternative_names, include:
+- Common abbreviations (JavaScript → js)
+- Related technologies (React → react.js, reactjs)
+- Broader/narrower categories (python → programming, coding)
+7. No matter what language the CV is in, the output MUST be in English
+""")
+# 6. Create standardized skill categories:
+# - Technical: programming languages, frameworks, tools
+# - Domain: industry-specific knowledge
+# - Soft skills: communication, leadership
+# - Languages: spoken/written languages with fluency level
+
+# Combined instructions so a whole CV is extracted in a single request
+_CV_SYS = SystemMessage(content=(
+    "Extract person, work experience and skill information from the Resume text in the user message. "
+    "Return one object with three keys: \"person\", \"experiences\" and \"skills\", "
+    "following the instructions in the matching tagged section below.\n\n"
+    "<PERSON>\n" + _CANDIDATE_SYS.content + "</PERSON>\n\n"
+    "<EXPERIENCES>\n" + _EXPERIENCE_SYS.content + "</EXPERIENCES>\n\n"
+    "<SKILLS>\n" + _SKILLS_SYS.content + "</SKILLS>\n"
+))
+
+# Job posting instructions; the posting text itself is sent as the user message
+_JOB_POSTING_SYS = SystemMessage(content="""Extract key information from the job posting text in the user message with consistent formatting for keyword matching with candidate resumes.
+
+Extract the following fields EXACTLY as specified:
+- job_title: The exact title of the position (lowercase)
+- alternative_titles: Comma-separated list of similar job titles that would qualify (lowercase, e.g., "software developer, software engineer, coder")
+- degree_requirement: MUST be EXACTLY one of these values only: "any", "bachelor", "master", "phd"
+
+# Fields of study as JSON array
+- fields_of_study: JSON array of objects with structure:
+  [
+    {"name": "field name (e.g., computer science)", 
+      "alternative_fields": "related fields (e.g., software engineering, information systems)", 
+      "importance": "required|preferred|nice-to-have"
+    },
+    # more fields...
+  ]
+
+- total_experience_years: Required minimum experience as a non-negative INTEGER (0 if unspecified)
+
+# Required specific experiences as JSON array
+- required_experiences: JSON array of objects with structure:
+  [
+    {"role": "experience role (e.g., project management)", 
+      "alternative_roles": "similar roles (e.g., program management, product management)", 
+      "importance": "required|preferred|nice-to-have",
+      "minimum_years": non-negative integer (0 if not specified)
+    },
+    # more experiences...
+  ]
+
+# Required skills as JSON array
+- required_skills: JSON array of objects with structure:
+  [
+    {"name": "skill name (e.g., python)", 
+      "alternative_names": "similar skills/technologies (e.g., python3, py)", 
+      "importance": "required|preferred|nice-to-have",
+      "minimum_years": non-negative integer (0 if not specified)
+    },
+    # more skills...
+  ]
+
+- location_city: Physical job location city only(e.g., "new york") or "remote" if fully remote (no shortened forms)
+- remote_option: "true" if remote work is possible, "false" otherwise
+- industry_sector: Industry the role belongs to (lowercase)
+- role_level: Seniority level (lowercase, e.g., "junior", "senior", "manager")
+- keywords: Additional relevant keywords for matching, comma-separated
+
+IMPORTANT:
+1. ALL text values MUST be lowercase
+2. Format JSON arrays exactly as shown with proper syntax
+3. Include as many job titles
+4. Include as many required skills and specific experiences
+5. For each skill, field of study, and experience, provide alternative names/fields
+6. Use "any" for degree_requirement ONLY if no specific requirement is mentioned
+7. Include all relevant fields of study, not just one
+8. Be precise and concise for maximum keyword matching effectiveness
+9. No matter what language the job posting is in, the output MUST be in English
+""")
+
+@functools.lru_cache(maxsize=None)
+def _load_env() -> None:
+    """Load the .env file on first use instead of at import (set SKIP_DOTENV=1 to use the process env as is)"""
+    if not os.getenv("SKIP_DOTENV"):
+        load_dotenv()
+
+
+# Chat models per running event loop, each entry holding the clients and the schemas bound to them.
+# httpx connections belong to the loop that opened them, and every process_all_cvs run and
+# asyncio.run call uses a new loop, so a pool is never shared across loops (see close_clients)
+_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def _create_clients() -> List[AzureChatOpenAI]:
+    """Create one AzureChatOpenAI client per configured deployment, sharing one HTTP connection pool"""
+    _load_env()
+    # HTTP/2 lets concurrent extractions multiplex over one TLS connection per endpoint.
+    # Idle connections keep httpx's default expiry, the pool only lives as long as one run's loop
+    http_async_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("AZURE_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("AZURE_MAX_KEEPALIVE_CONNECTIONS", "50"))
+        ),
+        timeout=60
+    )
+    deployments = json.loads(os.getenv("AZURE_DEPLOYMENTS_JSON") or "[]") or [{}]
+    return [
+        AzureChatOpenAI(
+            azure_deployment=deployment.get("deployment") or os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            openai_api_version=deployment.get("api_version") or os.getenv("AZURE_OPENAI_API_VERSION"),
+            azure_endpoint=deployment.get("endpoint") or os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=deployment.get("api_key") or os.getenv("AZURE_OPENAI_API_KEY"),
+            temperature=0,
+            # _call_llm's tenacity policy and the deployment fallbacks are the retry layers
+            # for extraction; SDK retries underneath would multiply every failed attempt
+            max_retries=0,
+            http_async_client=http_async_client
         )
-        
-        # Initialize the structured output models
-        self.person_model = self.langchain_model.with_structured_output(PersonEntity, method="function_calling")
-        self.position_model = self.langchain_model.with_structured_output(ResponseExperiences, method="function_calling")
-        self.skill_model = self.langchain_model.with_structured_output(ResponseSkills, method="function_calling")
-        self.job_posting_model = self.langchain_model.with_structured_output(JobPostingData, method="function_calling")
+        for deployment in deployments
+    ]
+
+
+def _loop_clients() -> Tuple[List[AzureChatOpenAI], Dict]:
+    """Return the (clients, bound schemas) entry of the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    entry = _CLIENTS.get(loop)
+    if entry is None:
+        entry = _CLIENTS[loop] = (_create_clients(), {})
+    return entry
+
+
+def get_clients() -> List[AzureChatOpenAI]:
+    """
+    Return the AzureChatOpenAI clients of the running event loop, creating them on first use
     
-        # Define prompt templates for different entity types
-        self._initialize_prompt_templates()
+    One client is created per Azure deployment listed in AZURE_DEPLOYMENTS_JSON, a JSON
+    list of objects with "deployment" and optional "endpoint", "api_key" and "api_version"
+    keys (missing keys fall back to the AZURE_OPENAI_* variables). Without it, the single
+    AZURE_OPENAI_DEPLOYMENT_NAME deployment is used. Must be called from a coroutine.
+    """
+    return _loop_clients()[0]
 
-    def _initialize_prompt_templates(self):
-        """Initialize prompt templates for entity extraction"""
-        self.candidate_prompt_tpl = """From the Resume text below, extract person information with consistent formatting.
-        
-        You MUST extract the list of following fields exactly as specified:
-        - id: Generate a unique identifier based on the name (e.g., "person_john_smith")
-        - name: Full name of the candidate (lowercase)
-        - job_title: Current professional role/title (lowercase)
-        - description: Brief summary of background and specialization (1-2 sentences, max 100 characters, lowercase)
-        - location_city: Extract the candidate's current city location (lowercase, e.g., "new york", "san francisco")
-        - has_degrees: A list of education entries, each containing:
-          - university: Name of the university or institution (lowercase)
-          - degree: MUST be EXACTLY one of these values only: "bachelor", "master", "phd", or "any" if unclear
-          - field_of_study: The field or major of study (e.g., "computer science", "business") (lowercase)
-          - graduation_year: Year of graduation as a 4-digit integer (between 1900-2100, estimate if unclear)
-          - alternative_fields: List of alternative fields of study (e.g., ["information technology", "software engineering"])
-        
-        IMPORTANT:
-        1. ALL text values MUST be lowercase
-        2. Do NOT include position or skill information
-        3. Use "any" for degree ONLY if the degree level cannot be determined
-        4. Ensure all fields are filled with appropriate values
-        5. For alternative_fields, include at least 2-3 closely related fields as a proper JSON array
-        6. No matter what language the CV is in, the output MUST be in English
-        7. If graduation_year cannot be determined, use the current year or estimate based on experience
-        8. For location_city, extract only the city name, not country or state. If not found, leave empty
-        
-        Resume text:
-        $ctext
-        """
-        
-        self.experience_prompt_tpl = """From the Resume text below, extract ALL work experience information with consistent formatting.
-        For EACH position, extract the following fields exactly:
-        - job_title: The position title (lowercase)
-        - alternative_job_titles: Comma-separated list of similar job titles that would qualify (lowercase, e.g., "software developer, software engineer, programmer")
-        - company_name: Name of the employer/company (lowercase)
-        - experience_in_years: Number of years in this position as an INTEGER (must be non-negative)
-        - description: Brief summary of responsibilities or achievements (1-2 sentences, lowercase)
+
+def get_client() -> AzureChatOpenAI:
+    """Return the primary AzureChatOpenAI client of the running event loop"""
+    return get_clients()[0]
+
+
+async def close_clients() -> None:
+    """Close the running event loop's HTTP connection pool; the next call on this loop opens a new one"""
+    entry = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        # The clients of one loop share a single httpx pool
+        await entry[0][0].http_async_client.aclose()
+
+
+def split_cv_text(text: str, model_name: str, max_tokens: Optional[int] = None) -> List[str]:
+    """
+    Split CV text into chunks of at most max_tokens tokens on line boundaries
+    
+    Args:
+        text: Cleaned CV text
+        model_name: Deployment/model name used to pick the tokenizer
+        max_tokens: Token budget per chunk, EXTRACTION_MAX_CHUNK_TOKENS (default 3000) when omitted
         
-        IMPORTANT:
-        1. ALL text values MUST be lowercase
-        2. Extract ALL positions/jobs mentioned in the resume
-        3. Calculate experience_in_years based on start/end dates (round to nearest year)
-        4. If exact dates aren't available, provide your best estimate
-        5. experience_in_years MUST be a non-negative integer (0 if unclear)
-        6. For alternative_job_titles, provide at least 3 most related alternative job titles
-        7. No matter what language the CV is in, the output MUST be in English
+    Returns:
+        List of text chunks (a single chunk when the CV fits the budget)
+    """
+    if max_tokens is None:
+        # CVs longer than this are split and extracted chunk by chunk so the response is not truncated
+        max_tokens = int(os.getenv("EXTRACTION_MAX_CHUNK_TOKENS", "3000"))
+    try:
+        encoding = tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        # Azure deployment names are arbitrary, fall back to the GPT-4o tokenizer
+        encoding = tiktoken.get_encoding("o200k_base")
+    
+    if len(encoding.encode(text)) <= max_tokens:
+        return [text]
+    
+    chunks = []
+    current_lines = []
+    current_tokens = 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = len(encoding.encode(line))
+        if current_lines and current_tokens + line_tokens > max_tokens:
+            chunks.append("".join(current_lines))
+            current_lines = []
+            current_tokens = 0
+        current_lines.append(line)
+        current_tokens += line_tokens
+    if current_lines:
+        chunks.append("".join(current_lines))
+    
+    return chunks
+
+
+def merge_cv_data(results: List[ResponseCVData]) -> ResponseCVData:
+    """
+    Merge per-chunk extraction results into a single CV result
+    
+    Args:
+        results: Extraction results in chunk order
         
-        Resume text:
-        $ctext
-        """
+    Returns:
+        Merged result with duplicate degrees, positions and skills removed
+    """
+    person = results[0].person.copy(deep=True)
+    degrees = {}
+    experiences = {}
+    skills = {}
+    for result in results:
+        # Fill person fields the earlier chunks could not determine
+        for field in ("id", "name", "job_title", "description", "location_city"):
+            if not getattr(person, field) and getattr(result.person, field):
+                setattr(person, field, getattr(result.person, field))
+        for degree in result.person.has_degrees or []:
+            degrees.setdefault((degree.university, degree.degree, degree.field_of_study.strip().lower()), degree)
+        for experience in result.experiences.experience:
+            experiences.setdefault((experience.job_title.strip().lower(), experience.company_name.strip().lower()), experience)
+        for skill in result.skills.skills:
+            key = skill.name.strip().lower()
+            # Keep the entry with the most experience when a skill shows up in several chunks
+            if key not in skills or skill.years_experience > skills[key].years_experience:
+                skills[key] = skill
     
-        self.skills_prompt_tpl = """From the Resume text below, extract ALL professional skills with consistent formatting.
-
-        For EACH skill, extract the following fields exactly:
-        - name: The specific skill name (lowercase, keep meaningful phrases together)
-        - alternative_names: Comma-separated list of related skills, variations, or technologies (lowercase, e.g., "react.js, reactjs, react native")
-        - level: MUST be EXACTLY one of: "beginner", "intermediate", "advanced", or "expert"
-        - years_experience: Number of years using this skill as an INTEGER (must be non-negative)
-
-        IMPORTANT:
-        1. ALL text values MUST be lowercase
-        2. Extract EVERY technical and professional skill mentioned
-        3. Infer skill levels using these guidelines:
-        - beginner: Basic understanding, minimal practical experience
-        - intermediate: Regular usage, comfortable with common applications
-        - advanced: Deep knowledge, can solve complex problems, 3+ years typical experience
-        - expert: Mastery level, can teach others, 5+ years typical experience
-        4. If years_experience is mentioned, use that exact value; otherwise infer based on:
-        - Recent graduates/entry positions: 0-1 years
-        - Mid-level positions: 2-4 years
-        - Senior positions: 5+ years
-        5. Keep meaningful compound skills together (e.g., "project management", "digital marketing")
-        6. For alternative_names, include:
-        - Common abbreviations (JavaScript → js)
-        - Related technologies (React → react.js, reactjs)
-        - Broader/narrower categories (python → programming, coding)
-        7. No matter what language the CV is in, the output MUST be in English
-
-        Resume text:
-        $ctext
-        """
-        # 6. Create standardized skill categories:
-        # - Technical: programming languages, frameworks, tools
-        # - Domain: industry-specific knowledge
-        # - Soft skills: communication, leadership
-        # - Languages: spoken/written languages with fluency level
+    person.has_degrees = list(degrees.values())
+    return ResponseCVData(
+        person=person,
+        experiences=ResponseExperiences(experience=list(experiences.values())),
+        skills=ResponseSkills(skills=list(skills.values()))
+    )
+
+
+class DataExtractionService:
+    def __init__(self):
+        """Initialize the data extraction service with LangChain AzureChatOpenAI client"""
+        _load_env()
+        self.deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") or ""
+        self._next_model = itertools.count()
+
+        # Bound the number of in-flight Azure OpenAI calls to stay under the deployment's rate limits.
+        # A semaphore binds to the event loop that first waits on it and every process_all_cvs run
+        # uses a new loop, so one semaphore is created per running loop (see _semaphore)
+        self._max_concurrency = int(os.getenv("AZURE_MAX_CONCURRENCY", "20"))
+        self._sems = weakref.WeakKeyDictionary()
+    
+        # Bind the module-level system message for the combined CV extraction
+        self.cv_sys = _CV_SYS
+
+    @property
+    def langchain_models(self) -> List[AzureChatOpenAI]:
+        """Chat models of the running event loop, one per Azure deployment"""
+        return get_clients()
+
+    @property
+    def langchain_model(self) -> AzureChatOpenAI:
+        """Primary chat model of the running event loop"""
+        return get_client()
+
+    async def aclose(self):
+        """Close the running event loop's Azure connections; call it when a run on a short-lived loop ends"""
+        await close_clients()
+
     def clean_text(self, text):
         """Clean text to remove non-ASCII characters"""
-        return re.sub(r'[^\x00-\x7F]+', ' ', text)
+        # Most CVs are plain ASCII already, so skip the regex engine entirely
+        if text.isascii():
+            return text
+        return _NON_ASCII_RE.sub(' ', text)
+
+    def _bind_schema(self, schema):
+        """
+        Bind a Pydantic schema as a forced function call and build the matching parser
+        
+        Returns one runnable per deployment, each starting at a different deployment and
+        falling back to the others when it is rate limited or unavailable.
+        """
+        bound = [
+            model.bind_tools([schema], tool_choice=schema.__name__, parallel_tool_calls=False)
+            for model in self.langchain_models
+        ]
+        models = []
+        for start in range(len(bound)):
+            rotated = bound[start:] + bound[:start]
+            if len(rotated) > 1:
+                models.append(rotated[0].with_fallbacks(rotated[1:], exceptions_to_handle=_FALLBACK_ERRORS))
+            else:
+                models.append(rotated[0])
+        parser = PydanticToolsParser(tools=[schema], first_tool_only=True)
+        return models, parser
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore of the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        sem = self._sems.get(loop)
+        if sem is None:
+            sem = self._sems[loop] = asyncio.Semaphore(self._max_concurrency)
+        return sem
+
+    @retry(
+        wait=wait_random_exponential(multiplier=1, max=60),
+        stop=stop_after_attempt(6),
+        retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+        reraise=True
+    )
+    async def _call_llm(self, model, messages):
+        """Stream one model response and return the accumulated message, retrying transient API errors"""
+        response = None
+        async with self._semaphore():
+            async for chunk in model.astream(messages):
+                response = chunk if response is None else response + chunk
+        return response
 
-    async def extract_entities(self, prompt_template, cv_text, model):
+    async def warm_up(self):
+        """Open the running event loop's connection to every Azure endpoint ahead of the first extraction"""
+        async def _ping(model):
+            try:
+                # Any response will do, the point is to pay for DNS and the TLS handshake now
+                await model.root_async_client.models.list()
+            except Exception as e:
+                logger.debug(f"Connection warm-up request failed: {e}")
+
+        await asyncio.gather(*(_ping(model) for model in self.langchain_models))
+
+    def _repair_tool_call(self, response, schema):
+        """Try to salvage malformed function-call JSON without another model call"""
+        for invalid_call in getattr(response, "invalid_tool_calls", None) or []:
+            if not invalid_call.get("args"):
+                continue
+            try:
+                return schema(**json.loads(repair_json(invalid_call["args"])))
+            except Exception as e:
+                logger.warning(f"Could not repair extraction output: {e}")
+        return None
+
+    async def extract_entities(self, system_message, cv_text, schema):
         """
         Extract entities from CV text using LangChain's structured output
         
         Args:
-            prompt_template: Template string for the prompt
+            system_message: Static SystemMessage holding the extraction instructions
             cv_text: CV text content
-            model: LangChain model with structured output
+            schema: Pydantic model the output must validate against
             
         Returns:
             Validated structured data
         """
         try:
-            # Prepare the prompt with CV text
-            prompt = Template(prompt_template).substitute(ctext=self.clean_text(cv_text))
+            # CV schemas are bound as forced tool calls, once per loop's clients, so the full
+            # response can be validated and retried on errors
+            structured_models = _loop_clients()[1]
+            if schema not in structured_models:
+                structured_models[schema] = self._bind_schema(schema)
+            models, parser = structured_models[schema]
+            # Round-robin across deployments to spread load over their rate-limit quotas
+            model = models[next(self._next_model) % len(models)]
+
+            # Keep the instructions as a stable prefix and send only the CV text per call
+            messages = [system_message, HumanMessage(content=_CV_MESSAGE_TPL.substitute(ctext=self.clean_text(cv_text)))]
             
-            # Call the model with structured output
-            result = await model.ainvoke(prompt)
-            return result
+            for attempt in range(_MAX_VALIDATION_RETRIES + 1):
+                # Stream the response and validate the complete message once it has arrived
+                response = await self._call_llm(model, messages)
+                # Streamed tool-call arguments are parsed leniently, so output cut off at the token
+                # limit still parses and mostly validates thanks to the schema defaults
+                truncated = (getattr(response, "response_metadata", None) or {}).get("finish_reason") == "length"
+
+                try:
+                    if truncated:
+                        raise ValueError("the output was truncated at the token limit, keep it shorter")
+                    return parser.invoke(response)
+                except ValueError as e:
+                    # Covers truncated output, malformed tool calls and Pydantic validation errors;
+                    # malformed JSON is repaired locally before paying for another call, but a
+                    # truncated response is incomplete however it is repaired
+                    repaired = None if truncated else self._repair_tool_call(response, schema)
+                    if repaired is not None:
+                        return repaired
+                    if attempt == _MAX_VALIDATION_RETRIES:
+                        raise
+                    logger.warning(f"Extraction output failed validation (attempt {attempt + 1}): {e}")
+
+                    # Feed the error back to the model; a tool call must be answered by a tool message
+                    feedback = f"Your output had error: {e}. Fix and retry."
+                    if response.tool_calls:
+                        feedback_message = ToolMessage(content=feedback, tool_call_id=response.tool_calls[0]["id"])
+                    else:
+                        feedback_message = HumanMessage(content=feedback)
+                    messages = messages + [response, feedback_message]
+                    await asyncio.sleep(1.0 * (attempt + 1))
             
         except Exception as e:
             logger.error(f"Entity extraction error: {str(e)}")
@@ -164,69 +525,11 @@ class DataExtractionService:
         logger.info("Extracting job posting information")
         
         try:
-            prompt = """Extract key information from the job posting text below with consistent formatting for keyword matching with candidate resumes.
-    
-            Job posting:
-            {0}
-            
-            Extract the following fields EXACTLY as specified:
-            - job_title: The exact title of the position (lowercase)
-            - alternative_titles: Comma-separated list of similar job titles that would qualify (lowercase, e.g., "software developer, software engineer, coder")
-            - degree_requirement: MUST be EXACTLY one of these values only: "any", "bachelor", "master", "phd"
-            
-            # Fields of study as JSON array
-            - fields_of_study: JSON array of objects with structure:
-              [
-                {{"name": "field name (e.g., computer science)", 
-                  "alternative_fields": "related fields (e.g., software engineering, information systems)", 
-                  "importance": "required|preferred|nice-to-have"
-                }},
-                # more fields...
-              ]
-            
-            - total_experience_years: Required minimum experience as a non-negative INTEGER (0 if unspecified)
-            
-            # Required specific experiences as JSON array
-            - required_experiences: JSON array of objects with structure:
-              [
-                {{"role": "experience role (e.g., project management)", 
-                  "alternative_roles": "similar roles (e.g., program management, product management)", 
-                  "importance": "required|preferred|nice-to-have",
-                  "minimum_years": non-negative integer (0 if not specified)
-                }},
-                # more experiences...
-              ]
-            
-            # Required skills as JSON array
-            - required_skills: JSON array of objects with structure:
-              [
-                {{"name": "skill name (e.g., python)", 
-                  "alternative_names": "similar skills/technologies (e.g., python3, py)", 
-                  "importance": "required|preferred|nice-to-have",
-                  "minimum_years": non-negative integer (0 if not specified)
-                }},
-                # more skills...
-              ]
-            
-            - location_city: Physical job location city only(e.g., "new york") or "remote" if fully remote (no shortened forms)
-            - remote_option: "true" if remote work is possible, "false" otherwise
-            - industry_sector: Industry the role belongs to (lowercase)
-            - role_level: Seniority level (lowercase, e.g., "junior", "senior", "manager")
-            - keywords: Additional relevant keywords for matching, comma-separated
-            
-            IMPORTANT:
-            1. ALL text values MUST be lowercase
-            2. Format JSON arrays exactly as shown with proper syntax
-            3. Include as many job titles
-            4. Include as many required skills and specific experiences
-            5. For each skill, field of study, and experience, provide alternative names/fields
-            6. Use "any" for degree_requirement ONLY if no specific requirement is mentioned
-            7. Include all relevant fields of study, not just one
-            8. Be precise and concise for maximum keyword matching effectiveness
-            9. No matter what language the job posting is in, the output MUST be in English
-            """
-            
-            result = await self.job_posting_model.ainvoke(prompt.format(job_posting_text))
+            messages = [_JOB_POSTING_SYS, HumanMessage(content=f"Job posting:\n{job_posting_text}")]
+            job_posting_model = self.langchain_model.with_structured_output(
+                JobPostingData, method="function_calling"
+            ).with_retry(retry_if_exception_type=_RETRYABLE_ERRORS, stop_after_attempt=3)
+            result = await job_posting_model.ainvoke(messages)
 
             logger.info(f"Job posting data: {result}")
             
@@ -237,6 +540,23 @@ class DataExtractionService:
             logger.error(f"Error extracting job posting information: {e}")
             return JobPostingData()  # Return empty object on error
         
+    async def _extract_cv_chunks(self, cleaned_text):
+        """Extract a CV in token-bounded chunks concurrently and merge the results"""
+        chunks = split_cv_text(cleaned_text, self.deployment)
+        if len(chunks) > 1:
+            logger.info(f"Splitting CV into {len(chunks)} chunks for extraction")
+        
+        # Person, experiences and skills come back from one request per chunk so the
+        # CV text is uploaded once instead of once per entity type
+        results = await asyncio.gather(
+            *(self.extract_entities(self.cv_sys, chunk, ResponseCVData) for chunk in chunks)
+        )
+        results = [result for result in results if result is not None]
+        if not results:
+            raise ValueError("No data returned from the CV extraction model")
+        
+        return results[0] if len(results) == 1 else merge_cv_data(results)
+
     async def extract_cv_data(self, cv_text, cv_filename=None):
         """
         Extract structured data from a CV using LangChain models
@@ -246,34 +566,41 @@ class DataExtractionService:
             cv_filename: The filename of the CV
             
         Returns:
-            Structured CV data
+            Structured CV data; on failure a placeholder of the same shape with
+            "extraction_failed" set to True
         """
         logger.info(f"Extracting data from CV: {cv_filename}")
         
         try:
-            # Extract all entities with LangChain structured output models
-            person_data = await self.extract_entities(
-                self.candidate_prompt_tpl,
-                cv_text,
-                self.person_model
-            )
-
-            logger.info(f"Person data: {person_data}")    
-            experience_data = await self.extract_entities(
-                self.experience_prompt_tpl,
-                cv_text, 
-                self.position_model
-            )
+            # Clean once up front; extract_entities then hits the ASCII fast path
+            cleaned_text = self.clean_text(cv_text)
+
+            # Identical CV text with the same prompt, schema and deployment yields the same result
+            cache_key = extraction_cache.make_key(self.deployment, _CV_SCHEMA_TAG, self.cv_sys.content, cleaned_text)
+            cached = extraction_cache.get(cache_key) if extraction_cache.is_enabled() else None
+            cv_data = None
+            if cached is not None:
+                try:
+                    cv_data = ResponseCVData(**cached)
+                    logger.info(f"Using cached extraction for CV: {cv_filename}")
+                except (TypeError, ValueError) as e:
+                    # An entry that no longer validates is a miss; the fresh result overwrites it
+                    logger.warning(f"Ignoring invalid cached extraction for CV {cv_filename}: {e}")
+            if cv_data is None:
+                cv_data = await self._extract_cv_chunks(cleaned_text)
+                if extraction_cache.is_enabled():
+                    extraction_cache.set(cache_key, cv_data.dict())
+            person_data, experience_data, skill_data = cv_data.person, cv_data.experiences, cv_data.skills
+            if not (person_data.name or "").strip():
+                # Sections are extracted together, so positions and skills found without a
+                # person would end up as orphaned relationships; drop them
+                logger.warning(f"No person found in CV {cv_filename}, discarding experiences and skills")
+                experience_data, skill_data = ResponseExperiences(), ResponseSkills()
+
+            logger.info(f"Person data: {person_data}")
             logger.info(f"Experience data: {experience_data}")
-            
-            skill_data = await self.extract_entities(
-                self.skills_prompt_tpl,
-                cv_text, 
-                self.skill_model
-            )
             logger.info(f"Skill data: {skill_data}")
             
-            
             extracted_data = {
                 "person": PersonEntityWithMetadata(**person_data.dict(), cv_text=cv_text, cv_file_address=cv_filename),
                 "experiences": experience_data,
@@ -286,11 +613,160 @@ class DataExtractionService:
             
         except Exception as e:
             logger.error(f"Error extracting CV data: {e}")
+            # Same types as a successful result, built fresh so callers can safely modify it
             return {
-                "person": PersonEntity(id="unknown", name="unknown", job_title="", description="", last_field_of_study="", last_degree="any"),
-                "experiences": [],
-                "skills": [],
-                "cv_file_address": cv_filename or ""
+                "person": PersonEntityWithMetadata(
+                    id="unknown",
+                    name="unknown",
+                    job_title="",
+                    description="",
+                    has_degrees=[],
+                    cv_text=cv_text,
+                    cv_file_address=cv_filename or ""
+                ),
+                "experiences": ResponseExperiences(),
+                "skills": ResponseSkills(),
+                "cv_file_address": cv_filename or "",
+                "extraction_failed": True
             }
         finally:
             logger.info(f"Finished extracting data from CV: {cv_filename}")
+
+    async def extract_cv_data_batch(self, cvs: List[Tuple[str, Optional[str]]]):
+        """
+        Extract structured data from several CVs, calling the model once per distinct text
+        
+        Args:
+            cvs: List of (cv_text, cv_filename) tuples
+            
+        Returns:
+            List of structured CV data, in the same order as the input
+        """
+        # Group files by the hash of their cleaned text so duplicate CVs share one extraction
+        groups = {}
+        for index, (cv_text, cv_filename) in enumerate(cvs):
+            text_hash = hashlib.sha256(self.clean_text(cv_text).encode("utf-8")).hexdigest()
+            groups.setdefault(text_hash, []).append(index)
+        
+        logger.info(f"Extracting {len(cvs)} CV(s) with {len(groups)} distinct text(s)")
+        
+        unique_indexes = [indexes[0] for indexes in groups.values()]
+        unique_results = await asyncio.gather(
+            *(self.extract_cv_data(*cvs[index]) for index in unique_indexes)
+        )
+        
+        # Broadcast each result to its duplicates, pointing the metadata at each file
+        results = [None] * len(cvs)
+        for indexes, extracted_data in zip(groups.values(), unique_results):
+            results[indexes[0]] = extracted_data
+            for index in indexes[1:]:
+                cv_text, cv_filename = cvs[index]
+                person = extracted_data["person"]
+                if isinstance(person, PersonEntityWithMetadata):
+                    person = person.copy(update={"cv_text": cv_text, "cv_file_address": cv_filename})
+                results[index] = {
+                    **extracted_data,
+                    "person": person,
+                    "cv_file_address": cv_filename or ""
+                }
+        
+        return results
+
+    async def process_cvs_batch(self, cvs: List[Tuple[str, str]]) -> str:
+        """
+        Submit CVs for offline extraction through the OpenAI Batch API
+        
+        Batch jobs run within 24 hours at a lower price and do not count
+        against the deployment's realtime rate limits.
+        
+        Args:
+            cvs: List of (cv_text, cv_filename) tuples
+            
+        Returns:
+            str: ID of the submitted batch job
+        """
+        tool = convert_to_openai_tool(ResponseCVData)
+        deployment = os.getenv("AZURE_OPENAI_BATCH_DEPLOYMENT_NAME") or self.deployment
+        
+        # One request line per CV chunk, tagged so results can be routed back to their file
+        lines = []
+        for cv_text, cv_filename in cvs:
+            for index, chunk in enumerate(split_cv_text(self.clean_text(cv_text), self.deployment)):
+                lines.append(json.dumps({
+                    "custom_id": f"{cv_filename}:{index}",
+                    "method": "POST",
+                    "url": "/chat/completions",
+                    "body": {
+                        "model": deployment,
+                        "temperature": 0,
+                        "messages": [
+                            {"role": "system", "content": self.cv_sys.content},
+                            {"role": "user", "content": _CV_MESSAGE_TPL.substitute(ctext=chunk)}
+                        ],
+                        "tools": [tool],
+                        "tool_choice": {"type": "function", "function": {"name": tool["function"]["name"]}},
+                        "parallel_tool_calls": False
+                    }
+                }))
+        
+        # These calls do not go through _call_llm, so they keep the SDK's own retries
+        client = self.langchain_model.root_async_client.with_options(max_retries=_SDK_MAX_RETRIES)
+        batch_file = await client.files.create(
+            file=("cv_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted extraction batch {batch.id} with {len(lines)} request(s) for {len(cvs)} CV(s)")
+        return batch.id
+
+    async def collect_cvs_batch(self, batch_id: str, poll_interval: float = 60) -> Dict[str, ResponseCVData]:
+        """
+        Wait for a batch submitted with process_cvs_batch and collect its results
+        
+        Args:
+            batch_id: ID returned by process_cvs_batch
+            poll_interval: Seconds between status checks
+            
+        Returns:
+            Dictionary mapping each CV filename to its extracted data
+        """
+        # These calls do not go through _call_llm, so they keep the SDK's own retries
+        client = self.langchain_model.root_async_client.with_options(max_retries=_SDK_MAX_RETRIES)
+        while True:
+            batch = await client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Extraction batch {batch_id} ended with status {batch.status}")
+            await asyncio.sleep(poll_interval)
+        
+        output = await client.files.content(batch.output_file_id)
+        
+        # Demultiplex the results by filename, keeping the chunk order
+        chunks_by_file = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            cv_filename, _, index = record["custom_id"].rpartition(":")
+            try:
+                message = record["response"]["body"]["choices"][0]["message"]
+                arguments = message["tool_calls"][0]["function"]["arguments"]
+                result = ResponseCVData(**json.loads(repair_json(arguments)))
+            except Exception as e:
+                logger.error(f"Invalid batch result for {record.get('custom_id')}: {e}")
+                continue
+            chunks_by_file.setdefault(cv_filename, []).append((int(index), result))
+        
+        results = {}
+        for cv_filename, chunks in chunks_by_file.items():
+            chunks.sort(key=lambda chunk: chunk[0])
+            chunk_results = [result for _, result in chunks]
+            results[cv_filename] = chunk_results[0] if len(chunk_results) == 1 else merge_cv_data(chunk_results)
+        
+        logger.info(f"Collected extraction batch {batch_id}: {len(results)} CV(s)")
+        return results
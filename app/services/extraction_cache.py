@@ -0,0 +1,77 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Define the base directory for cached LLM extraction results
+EXTRACTION_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "extraction_cache")
+
+
+def is_enabled() -> bool:
+    """Check whether the extraction cache is enabled (set EXTRACTION_NO_CACHE=1 to disable it)"""
+    return os.getenv("EXTRACTION_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def make_key(*parts: str) -> str:
+    """
+    Build a content-addressable cache key
+
+    Args:
+        parts: Strings that together determine the extraction result (deployment, schema, prompt, CV text)
+
+    Returns:
+        str: SHA-256 hex digest of the NUL-joined parts
+    """
+    return hashlib.sha256(b"\x00".join(part.encode("utf-8") for part in parts)).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(EXTRACTION_CACHE_DIR, f"{key}.json")
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a cached extraction result
+
+    Args:
+        key: Cache key from make_key
+
+    Returns:
+        dict: The cached result, or None on a miss or unreadable entry
+    """
+    try:
+        with open(_cache_path(key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable extraction cache entry {key}: {e}")
+        return None
+
+
+def set(key: str, value: Dict[str, Any]) -> None:
+    """
+    Store an extraction result in the cache
+
+    Args:
+        key: Cache key from make_key
+        value: JSON-serializable extraction result
+    """
+    path = _cache_path(key)
+    # Write to a temporary file first so readers never see a partial entry
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write extraction cache entry {key}: {e}")
+        # Do not leave the partial temporary file behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
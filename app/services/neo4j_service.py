@@ -1,9 +1,12 @@
 import os
+import atexit
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from neo4j import GraphDatabase, Transaction
+from cachetools import TTLCache
+from neo4j import GraphDatabase, Transaction, READ_ACCESS, WRITE_ACCESS
 from dotenv import load_dotenv
-import re
 from app.pyd_models.models import (
     PersonEntityWithMetadata,
     ResponseExperiences,
@@ -11,27 +14,433 @@ from app.pyd_models.models import (
     JobPostingData,
     EducationEntity
 )
-# Load environment variables
-load_dotenv()
+# Load environment variables unless the deployment injects them directly
+if not os.getenv("SKIP_DOTENV"):
+    load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Process-wide drivers keyed by connection settings; each driver's built-in connection pool is
+# shared by every Neo4jService instance that connects with the same settings. Each driver is
+# stored with its own bookmark manager, which tracks the transactions committed through it so
+# every session on that driver sees them (causal consistency); bookmarks of one server are
+# never sent to another
+_DRIVERS = {}
+_DRIVER_LOCK = threading.Lock()
+
+# Constraints only need to be created once per process
+_CONSTRAINTS_CREATED = False
+
+# The read query plans only need to be warmed once per process as well
+_PLAN_CACHE_WARMED = False
+
+# Read-aside cache of get_all_roles shared by all sessions; roles only change through this service,
+# which invalidates it on every write
+_ROLES_CACHE = TTLCache(maxsize=1, ttl=float(os.getenv("NEO4J_ROLES_CACHE_TTL", "60")))
+_ROLES_CACHE_LOCK = threading.Lock()
+
+# Same for get_all_candidates, with a shorter default TTL since background uploads add candidates
+_CANDIDATES_CACHE = TTLCache(maxsize=1, ttl=float(os.getenv("NEO4J_CANDIDATES_CACHE_TTL", "30")))
+_CANDIDATES_CACHE_LOCK = threading.Lock()
+
+# Drivers whose connectivity was verified recently; is_connected is polled on every page render,
+# so the server is pinged at most once per interval instead of on every call
+_CONNECTIVITY_CACHE = TTLCache(maxsize=8, ttl=float(os.getenv("NEO4J_CONNECTIVITY_CHECK_INTERVAL", "30")))
+_CONNECTIVITY_CACHE_LOCK = threading.Lock()
+
+
+def _driver_singleton(uri, username, password):
+    """
+    Return the shared Neo4j driver for these settings, creating and verifying it on first use
+    
+    Returns:
+        tuple: (driver, bookmark manager of that driver)
+    """
+    key = (uri, username, password)
+    entry = _DRIVERS.get(key)
+    if entry is None:
+        with _DRIVER_LOCK:
+            entry = _DRIVERS.get(key)
+            if entry is None:
+                # Pool limits are tunable so concurrent ingestion does not queue on connection checkout
+                pool_size = int(os.getenv("NEO4J_POOL_SIZE", "100"))
+                acquisition_timeout = float(os.getenv("NEO4J_ACQ_TIMEOUT", "60"))
+                # Fail fast on an unreachable server instead of the driver's 30s connect default
+                connection_timeout = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "15"))
+                driver = GraphDatabase.driver(
+                    uri,
+                    auth=(username, password),
+                    max_connection_pool_size=pool_size,
+                    connection_acquisition_timeout=acquisition_timeout,
+                    connection_timeout=connection_timeout,
+                    max_connection_lifetime=int(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")),
+                    # Upper bound on how long execute_read/execute_write keep retrying transient errors
+                    max_transaction_retry_time=float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", "30")),
+                    keep_alive=True
+                )
+                try:
+                    # Verified once per driver; later connect() calls are a dictionary lookup
+                    driver.verify_connectivity()
+                except Exception:
+                    # Do not cache a driver that cannot reach the database, so a later connect() can retry
+                    driver.close()
+                    raise
+                entry = _DRIVERS[key] = (driver, GraphDatabase.bookmark_manager())
+                logger.info(
+                    f"Neo4j driver created for {uri}: pool size {pool_size}, "
+                    f"acquisition timeout {acquisition_timeout}s, connection timeout {connection_timeout}s"
+                )
+    return entry
+
+
+@atexit.register
+def _close_driver():
+    """Close the shared drivers on interpreter shutdown"""
+    with _DRIVER_LOCK:
+        for driver, _ in _DRIVERS.values():
+            driver.close()
+        if _DRIVERS:
+            logger.info("Neo4j connection closed")
+        _DRIVERS.clear()
+
+
+def _split_csv(value):
+    """Split a comma-separated string into its stripped, non-empty items, stripping each item once"""
+    if not value:
+        return []
+    return [item for item in map(str.strip, value.split(",")) if item]
+
+
+def _dedupe(rows, *keys):
+    """Drop rows repeating the values of the given keys, keeping the first occurrence and the order"""
+    unique = {}
+    for row in rows:
+        unique.setdefault(tuple(row[key] for key in keys), row)
+    return list(unique.values())
+
+
+def _parse_fields(fields_of_study):
+    """
+    Turn the fields of study of a role into relationship rows in a single pass
+    
+    Args:
+        fields_of_study: List of dictionaries with name, alternative_fields and importance
+        
+    Returns:
+        tuple: (field rows, alternative field rows)
+    """
+    fields, alt_fields = [], []
+    for field in fields_of_study or []:
+        if not isinstance(field, dict):
+            continue
+        name = (field.get('name') or "").strip().lower()
+        if not name:
+            continue
+        fields.append({"name": name, "importance": field.get('importance', 'required')})
+        alt_fields.extend(
+            {"main": name, "alt": alt_field}
+            for alt_field in _split_csv((field.get('alternative_fields') or "").lower())
+        )
+    return fields, alt_fields
+
+
+def _parse_skills(required_skills):
+    """
+    Turn the required skills of a role into relationship rows in a single pass
+    
+    Args:
+        required_skills: List of dictionaries with name, alternative_names, importance and minimum_years
+        
+    Returns:
+        tuple: (skill rows, alternative name rows)
+    """
+    skills, alt_skills = [], []
+    for skill in required_skills or []:
+        if not isinstance(skill, dict):
+            continue
+        name = (skill.get('name') or "").strip().lower()
+        if not name:
+            continue
+        importance = skill.get('importance', 'required')
+        skills.append({
+            "name": name,
+            "importance": importance,
+            "is_required": importance == "required",
+            "minimum_years": skill.get('minimum_years', 0)
+        })
+        alt_skills.extend({"main": name, "alt": alt_name} for alt_name in _split_csv(skill.get('alternative_names')))
+    return skills, alt_skills
+
+
+def _to_native(value):
+    """Convert a Neo4j temporal value (stored with Cypher's datetime()) to a Python datetime"""
+    return value.to_native() if hasattr(value, "to_native") else value
+
+
+def _post_process_candidate(candidate):
+    """Return the upload date as a native datetime so the UI can format it without parsing"""
+    candidate["upload_date"] = _to_native(candidate["upload_date"])
+    return candidate
+
+
+def _post_process_role(role):
+    """Convert the timestamps of a role record to native datetimes"""
+    role["created_at"] = _to_native(role["created_at"])
+    role["updated_at"] = _to_native(role["updated_at"])
+    return role
+
+
+# Cypher statements are module-level constants so every call sends byte-identical text
+# and hits the server-side query plan cache; values are always passed as parameters
+_CONSTRAINTS = (
+    'CREATE CONSTRAINT unique_job_posting_id IF NOT EXISTS FOR (n:JobPosting) REQUIRE n.id IS UNIQUE',
+    'CREATE CONSTRAINT unique_candidate_id IF NOT EXISTS FOR (n:Candidate) REQUIRE n.id IS UNIQUE',
+    'CREATE CONSTRAINT unique_skill_name IF NOT EXISTS FOR (n:Skill) REQUIRE n.name IS UNIQUE',
+    'CREATE CONSTRAINT unique_field_of_study_name IF NOT EXISTS FOR (n:FieldOfStudy) REQUIRE n.name IS UNIQUE',
+    'CREATE CONSTRAINT unique_experience_title IF NOT EXISTS FOR (n:Experience) REQUIRE n.title IS UNIQUE',
+    'CREATE CONSTRAINT unique_location_city_name IF NOT EXISTS FOR (n:LocationCity) REQUIRE n.name IS UNIQUE',
+    'CREATE CONSTRAINT unique_keyword_name IF NOT EXISTS FOR (n:Keyword) REQUIRE n.name IS UNIQUE'
+)
+
+# Pattern comprehensions collect each relationship list per posting on the server, without
+# the row fan-out of chained OPTIONAL MATCHes or null placeholders for empty lists
+_GET_ALL_ROLES = """
+MATCH (job:JobPosting)
+RETURN 
+    job.id as id,
+    job.job_title as job_title,
+    job.title as title,
+    job.alternative_titles as alternative_titles,
+    job.degree_requirement as degree_requirement,
+    job.total_experience_years as experience_years,
+    job.remote_option as remote_option,
+    job.industry_sector as industry_sector,
+    job.role_level as role_level,
+    job.keywords as keywords,
+    job.created_at as created_at,
+    job.updated_at as updated_at,
+    head([(job)-[:AT]->(loc:LocationCity) | loc.name]) as location,
+    [(job)-[rs:REQUIRES_SKILL]->(skill:Skill) |
+        {name: skill.name, importance: rs.importance, minimum_years: rs.minimum_years}] as skills,
+    [(job)-[rf:REQUIRES_FIELD_OF_STUDY]->(field:FieldOfStudy) |
+        {name: field.name, importance: rf.importance}] as fields_of_study,
+    [(job)-[re:REQUIRES_EXPERIENCE]->(exp:Experience) |
+        {title: exp.title, years: re.years}] as experiences
+ORDER BY 
+    COALESCE(job.updated_at, job.created_at) DESC
+"""
+
+# Relationship clauses of a JobPosting `jp`, reading their rows from a `role` map
+_ROLE_RELATIONSHIPS = """
+FOREACH (location IN role.locations |
+  MERGE (lc:LocationCity {name: location})
+  CREATE (jp)-[:AT]->(lc)
+)
+FOREACH (field IN role.fields |
+  MERGE (f:FieldOfStudy {name: field.name})
+  CREATE (jp)-[:REQUIRES_FIELD_OF_STUDY {importance: field.importance}]->(f)
+)
+FOREACH (alt IN role.alt_fields |
+  MERGE (af:FieldOfStudy {name: alt.alt})
+  MERGE (f:FieldOfStudy {name: alt.main})
+  MERGE (af)-[:ALTERNATIVE_OF]->(f)
+)
+FOREACH (skill IN role.skills |
+  MERGE (s:Skill {name: skill.name})
+  CREATE (jp)-[:REQUIRES_SKILL {
+      importance: skill.importance,
+      is_required: skill.is_required,
+      minimum_years: skill.minimum_years
+  }]->(s)
+)
+FOREACH (alt IN role.alt_skills |
+  MERGE (alt_skill:Skill {name: alt.alt})
+  MERGE (s:Skill {name: alt.main})
+  MERGE (alt_skill)-[:ALTERNATIVE_OF]->(s)
+)
+FOREACH (exp IN role.experiences |
+  MERGE (e:Experience {title: exp.title})
+  CREATE (jp)-[:REQUIRES_EXPERIENCE {years: exp.years}]->(e)
+)
+FOREACH (keyword IN role.keywords |
+  MERGE (k:Keyword {name: keyword})
+  CREATE (jp)-[:HAS_KEYWORD]->(k)
+)
+"""
+
+# Creates or replaces every role in the list in a single statement
+_UPSERT_ROLES = """
+UNWIND $roles AS role
+MERGE (jp:JobPosting {id: role.posting_id})
+ON CREATE SET jp.created_at = datetime()
+ON MATCH SET jp.updated_at = datetime()
+SET jp += role.props
+WITH jp, role
+OPTIONAL MATCH (jp)-[r]-()
+DELETE r
+WITH DISTINCT jp, role
+""" + _ROLE_RELATIONSHIPS + """
+RETURN count(jp) as upserted
+"""
+
+_DELETE_ROLES = """
+UNWIND $role_ids AS role_id
+MATCH (jp:JobPosting {id: role_id})
+DETACH DELETE jp
+RETURN count(jp) as deleted
+"""
+
+# Writes every candidate in the list with all its relationships; FOREACH keeps one row per
+# candidate, so an empty list does not stop the following sections
+_CREATE_CANDIDATES = """
+UNWIND $candidates AS cand
+MERGE (c:Candidate {id: cand.candidate_id})
+ON CREATE SET c.created_at = datetime()
+ON MATCH SET c.updated_at = datetime()
+SET c += cand.props
+
+// Location if provided
+FOREACH (location IN CASE WHEN cand.location <> '' THEN [cand.location] ELSE [] END |
+  MERGE (lc:LocationCity {name: location})
+  MERGE (c)-[:FROM]->(lc)
+)
+
+// Add all educational backgrounds
+FOREACH (edu IN cand.education |
+  MERGE (f:FieldOfStudy {name: edu.field})
+  MERGE (c)-[:HAS_FIELD_OF_STUDY {
+    university: edu.university,
+    degree: edu.degree,
+    graduation_year: edu.year
+  }]->(f)
+)
+
+// Add all experiences
+FOREACH (exp IN cand.experiences |
+  MERGE (e:Experience {title: exp.title})
+  MERGE (c)-[:HAS_EXPERIENCE {
+    years: exp.years,
+    company: exp.company,
+    description: exp.description
+  }]->(e)
+)
+
+// Add all skills
+FOREACH (skill IN cand.skills |
+  MERGE (s:Skill {name: skill.name})
+  MERGE (c)-[:HAS_SKILL {
+    level: skill.level,
+    years: skill.years
+  }]->(s)
+)
+
+// Link alternative fields, titles and skills to their main node
+FOREACH (alt IN cand.alt_fields |
+  MERGE (af:FieldOfStudy {name: alt.alt_field})
+  MERGE (f:FieldOfStudy {name: alt.main_field})
+  MERGE (af)-[:ALTERNATIVE_OF]->(f)
+)
+FOREACH (alt_exp IN cand.alt_experiences |
+  MERGE (ae:Experience {title: alt_exp.alt_title})
+  MERGE (e:Experience {title: alt_exp.main_title})
+  MERGE (ae)-[:ALTERNATIVE_OF]->(e)
+)
+FOREACH (alt_skill IN cand.alt_skills |
+  MERGE (alt_s:Skill {name: alt_skill.alt_skill})
+  MERGE (s:Skill {name: alt_skill.main_skill})
+  MERGE (alt_s)-[:ALTERNATIVE_OF]->(s)
+)
+RETURN count(DISTINCT c) as created
+"""
+
+_GET_ALL_CANDIDATES = """
+MATCH (c:Candidate)
+RETURN 
+    c.id as id,
+    c.name as name,
+    c.job_title as job_title,
+    c.description as description,
+    c.cv_file_address as file_path,
+    c.created_at as upload_date,
+    EXISTS((c)-[:HAS_SKILL]->()) as has_skills,
+    EXISTS((c)-[:HAS_EXPERIENCE]->()) as has_experience,
+    EXISTS((c)-[:HAS_FIELD_OF_STUDY]->()) as has_education
+"""
+
+# Starts from the posting's unique id and only walks the skills it requires, so the score is
+# aggregated over the candidates sharing a skill instead of every candidate in the graph
+_FIND_MATCHING_CANDIDATES = """
+MATCH (jp:JobPosting {id: $role_id})-[req:REQUIRES_SKILL]->(skill:Skill)<-[:HAS_SKILL]-(c:Candidate)
+WITH c,
+     sum(CASE WHEN req.is_required THEN 2 ELSE 1 END) as score,
+     collect(skill.name) as matched_skills
+ORDER BY score DESC
+LIMIT $limit
+RETURN 
+    c.id as id,
+    c.name as name,
+    c.job_title as job_title,
+    score,
+    matched_skills
+"""
+
+# Always returns exactly one row, so a missing candidate is told apart from a failed query
+_DELETE_CANDIDATE = """
+OPTIONAL MATCH (c:Candidate {id: $candidate_id})
+WITH c, c.cv_file_address as file_path, c IS NOT NULL as found
+DETACH DELETE c
+RETURN found, file_path
+"""
+
+# Deletes in batches committed separately so the server never holds every candidate in one transaction
+_DELETE_ALL_CANDIDATES = """
+MATCH (c:Candidate)
+CALL {
+    WITH c
+    WITH c, c.cv_file_address as file_path
+    DETACH DELETE c
+    RETURN file_path
+} IN TRANSACTIONS OF 1000 ROWS
+RETURN collect(file_path) as file_paths
+"""
+# Read queries planned with EXPLAIN on first connect, with parameters of the types real calls use
+_WARM_UP_QUERIES = (
+    (_GET_ALL_ROLES, {}),
+    (_GET_ALL_CANDIDATES, {}),
+    (_FIND_MATCHING_CANDIDATES, {"role_id": "", "limit": 1}),
+)
+
+
 class Neo4jService:
+    """
+    Access to the candidate and role graph in Neo4j
+    
+    Instances may be shared between threads (Streamlit sessions, the background processor and
+    the add_candidates workers): they only hold a reference to the thread-safe shared driver.
+    Sessions are not thread-safe, so every operation opens its own short-lived session via
+    _session() and closes it before returning; a session is never stored on the instance.
+    """
     def __init__(self):
         """Initialize the Neo4j service"""
         self.uri = os.getenv("NEO4J_URI")
         self.username = os.getenv("NEO4J_USERNAME")
         self.password = os.getenv("NEO4J_PASSWORD")
+        # Naming the database up front saves the home-database resolution on every session
+        self.database = os.getenv("NEO4J_DATABASE", "neo4j")
         self.driver = None
+        self.bookmark_manager = None
         
         
     def connect(self):
         """Connect to the Neo4j database"""
         if not self.driver:
             try:
-                self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
-                self.driver.verify_connectivity()
+                self.driver, self.bookmark_manager = _driver_singleton(self.uri, self.username, self.password)
                 logger.info("Connected to Neo4j database")
+                if not _CONSTRAINTS_CREATED:
+                    self.create_constraints()
+                if not _PLAN_CACHE_WARMED:
+                    self.warm_plan_cache()
                 return True
             except Exception as e:
                 logger.error(f"Failed to connect to Neo4j: {e}")
@@ -39,111 +448,137 @@ class Neo4jService:
         return True
     
     def close(self):
-        """Close the Neo4j connection"""
-        if self.driver:
-            self.driver.close()
-            self.driver = None
-            logger.info("Neo4j connection closed")
+        """Release this service's reference to the shared driver (it is closed at interpreter exit)"""
+        self.driver = None
+        self.bookmark_manager = None
     
     def is_connected(self):
-        """Check if connected to Neo4j"""
-        try:
-            if self.driver:
-                self.driver.verify_connectivity()
-                return True
+        """Check if connected to Neo4j, reusing a recent successful check of the shared driver"""
+        driver = self.driver
+        if not driver:
             return False
+        
+        with _CONNECTIVITY_CACHE_LOCK:
+            if _CONNECTIVITY_CACHE.get(driver):
+                return True
+        
+        try:
+            driver.verify_connectivity()
         except Exception:
             return False
+        
+        with _CONNECTIVITY_CACHE_LOCK:
+            _CONNECTIVITY_CACHE[driver] = True
+        return True
     
-    def run_query(self, query, params=None):
-        """Run a Cypher query"""
+    def _session(self, access_mode):
+        """
+        Open a session on the shared driver
+        
+        All sessions on a driver share its bookmark manager, so a read always observes the writes
+        committed before it through that driver by any service instance (read-your-writes on
+        clusters too).
+        """
+        return self.driver.session(
+            database=self.database,
+            default_access_mode=access_mode,
+            bookmark_manager=self.bookmark_manager
+        )
+
+    @staticmethod
+    def _fetch_all(tx, query, params, transform=None):
+        """
+        Run a query inside a managed transaction and consume its records before it closes
+        
+        The optional transform is applied while iterating the cursor, so results are
+        post-processed in the same pass instead of walking a materialized list again.
+        """
+        if transform is None:
+            return [record.data() for record in tx.run(query, params)]
+        return [transform(record.data()) for record in tx.run(query, params)]
+
+    @staticmethod
+    def _fetch_one(tx, query, params):
+        """Run a query inside a managed transaction and return only its first record, or None"""
+        record = next(iter(tx.run(query, params)), None)
+        return record.data() if record is not None else None
+
+    def run_read(self, query, params=None, transform=None):
+        """Run a read-only Cypher query in a managed transaction, retried on transient errors"""
         if not self.connect():
             return None
         
         try:
-            with self.driver.session() as session:
-                result = session.run(query, params or {})
-                return [record.data() for record in result]
+            with self._session(READ_ACCESS) as session:
+                return session.execute_read(self._fetch_all, query, params or {}, transform)
         except Exception as e:
             logger.error(f"Query execution error: {e}")
             return None
     
-    def get_prop_str(self, prop_dict, _id):
-        """Generate property string for Cypher query"""
-        s = []
-        for key, val in prop_dict.items():
-            if key != 'label' and key != 'id':
-                escaped_val = str(val).replace('"', '\\"')
-                s.append(f'{_id}.{key} = "{escaped_val}"')
-        return ' ON CREATE SET ' + ','.join(s)
+    def run_write(self, query, params=None):
+        """Run a Cypher write query in a managed transaction, retried on transient errors"""
+        if not self.connect():
+            return None
+        
+        try:
+            with self._session(WRITE_ACCESS) as session:
+                return session.execute_write(self._fetch_all, query, params or {})
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            return None
     
-    def get_cypher_compliant_var(self, _id):
-        """Generate a Cypher-compliant variable name"""
-        s = "_" + re.sub(r'[\W_]', '', _id).lower()  # avoid numbers appearing as firstchar
-        return s[:20]  # restrict variable size
+    def run_write_one(self, query, params=None):
+        """Run a Cypher write query returning a single row, without buffering a result list"""
+        if not self.connect():
+            return None
+        
+        try:
+            with self._session(WRITE_ACCESS) as session:
+                return session.execute_write(self._fetch_one, query, params or {})
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            return None
     
-    # def generate_cypher(self, file_name, in_json):
-    #     """Generate Cypher statements for entity and relationship insertion"""
-    #     e_map = {}
-    #     e_stmt = []
-    #     r_stmt = []
-    #     e_stmt_tpl = Template("($id:$label{id:'$key'})")
-    #     r_stmt_tpl = Template("""
-    #       MATCH $src
-    #       MATCH $tgt
-    #       MERGE ($src_id)-[:$rel]->($tgt_id)
-    #     """)
+    def create_constraints(self):
+        """Create the uniqueness constraints (and their backing indexes) used by the MATCH/MERGE lookups"""
+        global _CONSTRAINTS_CREATED
+        if not self.connect():
+            return
         
-    #     # Handle entities
-    #     for obj in in_json:
-    #         for j in obj['entities']:
-    #             props = ''
-    #             label = j['label']
-    #             id = ''
-    #             if label == 'Person':
-    #                 id = 'p' + str(file_name)
-    #             elif label == 'Position':
-    #                 c = j['id'].replace('position', '_')
-    #                 id = f'j{str(file_name)}{c}'
-    #             elif label == 'Education':
-    #                 c = j['id'].replace('education', '_')
-    #                 id = f'e{str(file_name)}{c}'
-    #             else:
-    #                 id = self.get_cypher_compliant_var(j['name'])
-                
-    #             if label in ['Person', 'Position', 'Education', 'Skill', 'Company']:
-    #                 varname = self.get_cypher_compliant_var(j['id'])
-    #                 stmt = e_stmt_tpl.substitute(id=varname, label=label, key=id)
-    #                 e_map[varname] = stmt
-    #                 e_stmt.append('MERGE ' + stmt + self.get_prop_str(j, varname))
-            
-    #         # Handle relationships
-    #         for st in obj['relationships']:
-    #             rels = st.split("|")
-    #             src_id = self.get_cypher_compliant_var(rels[0].strip())
-    #             rel = rels[1].strip()
-    #             if rel in ['HAS_SKILL', 'HAS_EDUCATION', 'AT_COMPANY', 'HAS_POSITION']:
-    #                 tgt_id = self.get_cypher_compliant_var(rels[2].strip())
-    #                 stmt = r_stmt_tpl.substitute(
-    #                     src_id=src_id, tgt_id=tgt_id, src=e_map[src_id], tgt=e_map[tgt_id], rel=rel)
-    #                 r_stmt.append(stmt)
+        try:
+            # All constraints go through one session and transaction instead of one per statement
+            with self._session(WRITE_ACCESS) as session:
+                session.execute_write(self._create_constraints_transaction)
+        except Exception as e:
+            logger.error(f"Error creating Neo4j constraints: {e}")
+            return
         
-    #     return e_stmt, r_stmt
+        _CONSTRAINTS_CREATED = True
+        logger.info("Neo4j constraints created")
     
-    # def create_constraints(self):
-    #     """Create necessary constraints in Neo4j"""
-    #     constraints = [
-    #         'CREATE CONSTRAINT unique_person_id IF NOT EXISTS FOR (n:Person) REQUIRE (n.id) IS UNIQUE',
-    #         'CREATE CONSTRAINT unique_position_id IF NOT EXISTS FOR (n:Position) REQUIRE (n.id) IS UNIQUE',
-    #         'CREATE CONSTRAINT unique_skill_id IF NOT EXISTS FOR (n:Skill) REQUIRE n.id IS UNIQUE',
-    #         'CREATE CONSTRAINT unique_education_id IF NOT EXISTS FOR (n:Education) REQUIRE n.id IS UNIQUE',
-    #         'CREATE CONSTRAINT unique_company_id IF NOT EXISTS FOR (n:Company) REQUIRE n.id IS UNIQUE'
-    #     ]
-        
-    #     for constraint in constraints:
-    #         self.run_query(constraint)
+    def _create_constraints_transaction(self, tx: Transaction) -> None:
+        """Run every constraint statement in the given transaction"""
+        for constraint in _CONSTRAINTS:
+            tx.run(constraint).consume()
+    
+    def warm_plan_cache(self):
+        """Plan the listing and matching queries with EXPLAIN so their first real call skips planning"""
+        global _PLAN_CACHE_WARMED
+        try:
+            with self._session(READ_ACCESS) as session:
+                session.execute_read(self._warm_plan_cache_transaction)
+        except Exception as e:
+            # Only a latency optimization, so a failure must not fail the connection
+            logger.warning(f"Could not warm the Neo4j query plan cache: {e}")
+            return
         
-    #     logger.info("Neo4j constraints created")
+        _PLAN_CACHE_WARMED = True
+        logger.info("Neo4j query plan cache warmed")
+    
+    def _warm_plan_cache_transaction(self, tx: Transaction) -> None:
+        """EXPLAIN every warm-up query in the given transaction without executing it"""
+        for query, params in _WARM_UP_QUERIES:
+            tx.run("EXPLAIN " + query, params).consume()
         
     def get_all_roles(self) -> List[Dict[str, Any]]:
         """
@@ -152,59 +587,31 @@ class Neo4jService:
         Returns:
             List of dictionaries containing role data with related fields, skills, etc.
         """
+        with _ROLES_CACHE_LOCK:
+            cached = _ROLES_CACHE.get("roles")
+        if cached is not None:
+            return list(cached)
+        
         if not self.connect():
             logger.warning("Cannot connect to Neo4j to fetch roles")
             return []
         
-        query = """
-        MATCH (job:JobPosting)
-        
-        // Get required skills with importance
-        OPTIONAL MATCH (job)-[rs:REQUIRES_SKILL]->(skill:Skill)
-        WITH job, 
-             collect({name: skill.name, importance: rs.importance, minimum_years: rs.minimum_years}) as skills
-        
-        // Get fields of study
-        OPTIONAL MATCH (job)-[rf:REQUIRES_FIELD_OF_STUDY]->(field:FieldOfStudy)
-        WITH job, skills, 
-             collect({name: field.name, importance: rf.importance}) as fields_of_study
-        
-        // Get location
-        OPTIONAL MATCH (job)-[:AT]->(loc:LocationCity)
-        
-        // Get required experiences
-        OPTIONAL MATCH (job)-[re:REQUIRES_EXPERIENCE]->(exp:Experience)
-        WITH job, skills, fields_of_study, loc,
-             collect({title: exp.title, years: re.years}) as experiences
-             
-        RETURN 
-            job.id as id,
-            job.job_title as job_title,
-            job.title as title,
-            job.alternative_titles as alternative_titles,
-            job.degree_requirement as degree_requirement,
-            job.total_experience_years as experience_years,
-            job.remote_option as remote_option,
-            job.industry_sector as industry_sector,
-            job.role_level as role_level,
-            job.keywords as keywords,
-            job.created_at as created_at,
-            job.updated_at as updated_at,
-            loc.name as location,
-            skills,
-            fields_of_study,
-            experiences
-        ORDER BY 
-            COALESCE(job.updated_at, job.created_at) DESC
-        """
-        
         try:
-            result = self.run_query(query)
-            return result if result else []
+            result = self.run_read(_GET_ALL_ROLES, transform=_post_process_role)
+            if result is None:
+                return []
+            with _ROLES_CACHE_LOCK:
+                _ROLES_CACHE["roles"] = result
+            return list(result)
         except Exception as e:
             logger.error(f"Error fetching roles: {e}")
             return []
 
+    def invalidate_roles_cache(self) -> None:
+        """Drop the cached role list so the next get_all_roles reads from Neo4j"""
+        with _ROLES_CACHE_LOCK:
+            _ROLES_CACHE.clear()
+
     def add_role(
         self, 
         role_id: str, 
@@ -247,25 +654,27 @@ class Neo4jService:
             return False
         
         try:
-            # Begin transaction for atomic operation
-            with self.driver.session() as session:
-                session.execute_write(
-                    self._create_or_update_role_transaction, 
-                    role_id, 
-                    job_title,
-                    alternative_titles,
-                    degree_requirement,
-                    fields_of_study,
-                    total_experience_years,
-                    required_skills,
-                    required_experiences,  # Added parameter
-                    location_city,  # Changed from location to location_city
-                    remote_option,
-                    industry_sector,
-                    role_level,
-                    keywords
-                )
+            # The posting, its properties and all its relationships are created or replaced
+            # by one statement in one transaction, so readers never see a half-updated role
+            row = self._role_row(
+                role_id,
+                job_title,
+                alternative_titles,
+                degree_requirement,
+                fields_of_study,
+                total_experience_years,
+                required_skills,
+                required_experiences,
+                location_city,
+                remote_option,
+                industry_sector,
+                role_level,
+                keywords
+            )
+            with self._session(WRITE_ACCESS) as session:
+                session.execute_write(self._upsert_roles_transaction, [row])
                 
+            self.invalidate_roles_cache()
             logger.info(f"Role {role_id} added/updated successfully")
             return True
             
@@ -273,482 +682,178 @@ class Neo4jService:
             logger.error(f"Error adding role: {e}")
             return False
     
-    def _create_role_transaction(
-        self, 
-        tx: Transaction, 
-        role_id: str, 
-        job_title: str, 
-        alternative_titles: Optional[str] = None, 
-        degree_requirement: Optional[str] = None, 
-        fields_of_study: Optional[List[Dict[str, Any]]] = None, 
-        total_experience_years: int = 0, 
-        required_skills: Optional[List[Dict[str, Any]]] = None,
-        required_experiences: Optional[List[Dict[str, Any]]] = None,  # Added parameter
-        location_city: Optional[str] = None,  
-        remote_option: Optional[bool] = False, 
-        industry_sector: Optional[str] = None, 
-        role_level: Optional[str] = None,
-        keywords: Optional[str] = None
-    ) -> bool:
-        """
-        Create a new JobPosting node and its relationships in Neo4j without updating existing data
+    def add_roles(self, roles: List[Dict[str, Any]]) -> int:
         """
-        # First check if the job posting already exists
-        check_result = tx.run(
-            "MATCH (j:JobPosting {id: $posting_id}) RETURN count(j) as count",
-            {"posting_id": role_id}
-        ).single()
+        Add or update many roles in a single write transaction
         
-        if check_result and check_result["count"] > 0:
-            return False
-        
-        # Convert boolean to string for Neo4j compatibility
-        remote_option_str = str(remote_option).lower()
-        
-        # Create JobPosting node with all properties (excluding location)
-        tx.run("""
-        CREATE (jp:JobPosting {
-            id: $posting_id,
-            title: $job_title,
-            job_title: $job_title,
-            alternative_titles: $alternative_titles,
-            degree_requirement: $degree_requirement,
-            total_experience_years: $total_experience_years,
-            remote_option: $remote_option,
-            industry_sector: $industry_sector,
-            role_level: $role_level,
-            keywords: $keywords,
-            description: $job_description,
-            posting_text: $posting_text,
-            created_at: datetime()
-        })
-        RETURN jp
-        """, {
-            "posting_id": role_id,
-            "job_title": job_title,
-            "alternative_titles": alternative_titles or "",
-            "degree_requirement": degree_requirement or "any",
-            "total_experience_years": total_experience_years or 0,
-            "remote_option": remote_option_str,
-            "industry_sector": industry_sector or "",
-            "role_level": role_level or "",
-            "keywords": keywords or "",
-            "job_description": keywords or "",
-            "posting_text": f"{job_title} - {industry_sector or ''} - {keywords or ''}"
-        })
-        
-        # Create LocationCity node and relationship if location_city is provided
-        if location_city and location_city.strip():
-            tx.run("""
-            MERGE (lc:LocationCity {name: $location})
-            WITH lc
-            MATCH (jp:JobPosting {id: $posting_id})
-            CREATE (jp)-[:AT]->(lc)
-            """, {
-                "posting_id": role_id,
-                "location": location_city.strip().lower()
-            })
-        
-        # Process fields of study relationships directly to JobPosting
-        if fields_of_study:
-            for field in fields_of_study:
-                if isinstance(field, dict) and 'name' in field and field['name'].strip():
-                    field_name = field['name'].strip().lower()
-                    alternative_fields = field.get('alternative_fields', '').strip().lower() if field.get('alternative_fields') else ""
-                    importance = field.get('importance', 'required')
-                    
-                    # Create main field of study node and relationship directly to JobPosting
-                    tx.run("""
-                    MERGE (f:FieldOfStudy {name: $field_name})
-                    WITH f
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[rel:REQUIRES_FIELD_OF_STUDY {importance: $importance}]->(f)
-                    """, {
-                        "posting_id": role_id,
-                        "field_name": field_name,
-                        "importance": importance
-                    })           
-                    
-                    # Create alternative fields
-                    if alternative_fields:
-                        for alt_field in [f.strip() for f in alternative_fields.split(",") if f.strip()]:
-                            tx.run("""
-                            MERGE (af:FieldOfStudy {name: $alt_field_name})
-                            WITH af
-                            MATCH (f:FieldOfStudy {name: $field_name})
-                            CREATE (af)-[:ALTERNATIVE_OF]->(f)
-                            """, {
-                                "alt_field_name": alt_field,
-                                "field_name": field_name
-                            })
+        Args:
+            roles: List of dictionaries with the keyword arguments of add_role
+            
+        Returns:
+            int: Number of roles written, 0 on failure
+        """
+        if not roles:
+            return 0
         
-        # Process required skills
-        if required_skills:
-            for skill in required_skills:
-                if isinstance(skill, dict) and 'name' in skill and skill['name'].strip():
-                    skill_name = skill['name'].strip().lower()
-                    importance = skill.get('importance', 'required')
-                    minimum_years = skill.get('minimum_years', 0)
-                    alt_names = skill.get('alternative_names', '')
-                    
-                    tx.run("""
-                    MERGE (s:Skill {name: $skill_name})
-                    WITH s
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[rel:REQUIRES_SKILL {
-                        importance: $importance, 
-                        is_required: $is_required,
-                        minimum_years: $minimum_years
-                    }]->(s)
-                    """, {
-                        "posting_id": role_id,
-                        "skill_name": skill_name,
-                        "importance": importance,
-                        "is_required": importance == "required",
-                        "minimum_years": minimum_years
-                    })
-                    
-                    # Process alternative skill names
-                    if alt_names:
-                        for alt_name in [n.strip() for n in alt_names.split(",") if n.strip()]:
-                            tx.run("""
-                            MERGE (as:Skill {name: $alt_name})
-                            WITH as
-                            MATCH (s:Skill {name: $skill_name})
-                            CREATE (as)-[:ALTERNATIVE_OF]->(s)
-                            """, {
-                                "alt_name": alt_name,
-                                "skill_name": skill_name
-                            })
-    
-        # Create REQUIRES_EXPERIENCE relationship
-        if job_title and total_experience_years:
-            #Create job title experience as Experience node
-            tx.run("""
-            MERGE (e:Experience {title: $job_title})
-            WITH e
-            MATCH (jp:JobPosting {id: $posting_id})
-            CREATE (jp)-[:REQUIRES_EXPERIENCE {years: $total_experience_years}]->(e)
-            """, {
-                "posting_id": role_id,
-                "job_title": job_title,
-                "total_experience_years": total_experience_years
-            })
-            #Create similar job titles as experience nodes
-            if alternative_titles:
-                for alt_title in [t.strip() for t in alternative_titles.split(",") if t.strip()]:
-                    tx.run("""
-                    MERGE (e:Experience {title: $alt_title})
-                    WITH e
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[:REQUIRES_EXPERIENCE {years: $total_experience_years}]->(e)
-                    """, {
-                        "posting_id": role_id,
-                        "alt_title": alt_title,
-                        "total_experience_years": total_experience_years
-                    })
+        if not self.connect():
+            logger.warning("Cannot connect to Neo4j to add roles")
+            return 0
         
-        # Process required experiences explicitly defined
-        if required_experiences:
-            for exp in required_experiences:
-                if isinstance(exp, dict) and 'title' in exp and exp['title'].strip():
-                    exp_title = exp['title'].strip().lower()
-                    years = exp.get('years', 0)
-                    
-                    tx.run("""
-                    MERGE (e:Experience {title: $exp_title})
-                    WITH e
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[:REQUIRES_EXPERIENCE {years: $years}]->(e)
-                    """, {
-                        "posting_id": role_id,
-                        "exp_title": exp_title,
-                        "years": years
-                    })
+        try:
+            rows = [self._role_row(**role) for role in roles]
+            with self._session(WRITE_ACCESS) as session:
+                upserted = session.execute_write(self._upsert_roles_transaction, rows)
             
-        # Add any explicit keywords as Keyword nodes
-        if keywords:
-            for keyword in [k.strip() for k in keywords.split(",") if k.strip()]:
-                tx.run("""
-                MERGE (k:Keyword {name: $keyword})
-                WITH k
-                MATCH (jp:JobPosting {id: $posting_id})
-                CREATE (jp)-[:HAS_KEYWORD]->(k)
-                """, {
-                    "posting_id": role_id,
-                    "keyword": keyword
-                })
+            self.invalidate_roles_cache()
+            logger.info(f"Added/updated {upserted} roles")
+            return upserted
         
-        return True
+        except Exception as e:
+            logger.error(f"Error adding roles: {e}")
+            return 0
     
-    def _update_role_transaction(
-        self, 
-        tx: Transaction, 
-        role_id: str, 
-        job_title: str, 
-        alternative_titles: Optional[str] = None, 
-        degree_requirement: Optional[str] = None, 
-        fields_of_study: Optional[List[Dict[str, Any]]] = None, 
-        total_experience_years: int = 0, 
-        required_skills: Optional[List[Dict[str, Any]]] = None,
-        required_experiences: Optional[List[Dict[str, Any]]] = None,  # Added parameter
-        location_city: Optional[str] = None,  
-        remote_option: Optional[bool] = False, 
-        industry_sector: Optional[str] = None, 
+    def _upsert_roles_transaction(self, tx: Transaction, rows: List[Dict[str, Any]]) -> int:
+        """Create or replace every role row and its relationships with one UNWIND statement"""
+        return tx.run(_UPSERT_ROLES, {"roles": rows}).single()["upserted"]
+    
+    def _role_properties(
+        self,
+        job_title: str,
+        alternative_titles: Optional[str] = None,
+        degree_requirement: Optional[str] = None,
+        total_experience_years: int = 0,
+        remote_option: Optional[bool] = False,
+        industry_sector: Optional[str] = None,
         role_level: Optional[str] = None,
         keywords: Optional[str] = None
-    ) -> bool:
-        """
-        Update an existing JobPosting node and its relationships in Neo4j
-        """
-        # First delete all existing relationships
-        tx.run("""
-        MATCH (jp:JobPosting {id: $posting_id})
-        OPTIONAL MATCH (jp)-[r]-()
-        DELETE r
-        """, {"posting_id": role_id})
-        
-        # Update node properties (excluding location which will be a separate node)
-        remote_option_str = str(remote_option).lower()
-        
-        tx.run("""
-        MATCH (jp:JobPosting {id: $posting_id})
-        SET jp.title = $job_title,
-            jp.job_title = $job_title,
-            jp.alternative_titles = $alternative_titles,
-            jp.degree_requirement = $degree_requirement,
-            jp.total_experience_years = $total_experience_years,
-            jp.remote_option = $remote_option,
-            jp.industry_sector = $industry_sector,
-            jp.role_level = $role_level,
-            jp.keywords = $keywords,
-            jp.description = $job_description,
-            jp.posting_text = $posting_text,
-            jp.updated_at = datetime()
-        """, {
-            "posting_id": role_id,
+    ) -> Dict[str, Any]:
+        """Build the JobPosting property map, sent as one $props parameter by create and update"""
+        return {
+            "title": job_title,
             "job_title": job_title,
             "alternative_titles": alternative_titles or "",
             "degree_requirement": degree_requirement or "any",
             "total_experience_years": total_experience_years or 0,
-            "remote_option": remote_option_str,
+            # Convert boolean to string for Neo4j compatibility
+            "remote_option": str(remote_option).lower(),
             "industry_sector": industry_sector or "",
             "role_level": role_level or "",
             "keywords": keywords or "",
-            "job_description": keywords or "",
+            "description": keywords or "",
             "posting_text": f"{job_title} - {industry_sector or ''} - {keywords or ''}"
-        })
-        
-        # Create LocationCity node and relationship if location_city is provided
-        if location_city and location_city.strip():
-            tx.run("""
-            MERGE (lc:LocationCity {name: $location})
-            WITH lc
-            MATCH (jp:JobPosting {id: $posting_id})
-            CREATE (jp)-[:AT]->(lc)
-            """, {
-                "posting_id": role_id,
-                "location": location_city.strip().lower()
-            })
-        
-        # Process fields of study
-        if fields_of_study:
-            for field in fields_of_study:
-                if isinstance(field, dict) and 'name' in field and field['name'].strip():
-                    field_name = field['name'].strip().lower()
-                    alternative_fields = field.get('alternative_fields', '').strip().lower() if field.get('alternative_fields') else ""
-                    importance = field.get('importance', 'required')
-                    
-                    tx.run("""
-                    MERGE (f:FieldOfStudy {name: $field_name})
-                    WITH f
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[rel:REQUIRES_FIELD_OF_STUDY {importance: $importance}]->(f)
-                    """, {
-                        "posting_id": role_id,
-                        "field_name": field_name,
-                        "importance": importance
-                    })
-                    
-                    # Create alternative fields
-                    if alternative_fields:
-                        for alt_field in [f.strip() for f in alternative_fields.split(",") if f.strip()]:
-                            tx.run("""
-                            MERGE (af:FieldOfStudy {name: $alt_field_name})
-                            WITH af
-                            MATCH (f:FieldOfStudy {name: $field_name})
-                            CREATE (af)-[:ALTERNATIVE_OF]->(f)
-                            """, {
-                                "alt_field_name": alt_field,
-                                "field_name": field_name
-                            })
-        
-        # Process required skills - using same logic as create transaction
-        if required_skills:
-            for skill in required_skills:
-                if isinstance(skill, dict) and 'name' in skill and skill['name'].strip():
-                    skill_name = skill['name'].strip().lower()
-                    importance = skill.get('importance', 'required')
-                    minimum_years = skill.get('minimum_years', 0)
-                    alt_names = skill.get('alternative_names', '')
-                    
-                    tx.run("""
-                    MERGE (s:Skill {name: $skill_name})
-                    WITH s
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[rel:REQUIRES_SKILL {
-                        importance: $importance, 
-                        is_required: $is_required,
-                        minimum_years: $minimum_years
-                    }]->(s)
-                    """, {
-                        "posting_id": role_id,
-                        "skill_name": skill_name,
-                        "importance": importance,
-                        "is_required": importance == "required",
-                        "minimum_years": minimum_years
-                    })
-                    
-                    # Process alternative skill names
-                    if alt_names:
-                        for alt_name in [n.strip() for n in alt_names.split(",") if n.strip()]:
-                            tx.run("""
-                            MERGE (as:Skill {name: $alt_name})
-                            WITH as
-                            MATCH (s:Skill {name: $skill_name})
-                            CREATE (as)-[:ALTERNATIVE_OF]->(s)
-                            """, {
-                                "alt_name": alt_name,
-                                "skill_name": skill_name
-                            })
+        }
+    
+    def _role_relationship_params(
+        self,
+        job_title: str,
+        alternative_titles: Optional[str] = None,
+        fields_of_study: Optional[List[Dict[str, Any]]] = None,
+        total_experience_years: int = 0,
+        required_skills: Optional[List[Dict[str, Any]]] = None,
+        required_experiences: Optional[List[Dict[str, Any]]] = None,
+        location_city: Optional[str] = None,
+        keywords: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the location, field of study, skill, experience and keyword rows of a JobPosting"""
+        field_params, alt_field_params = _parse_fields(fields_of_study)
+        skill_params, alt_skill_params = _parse_skills(required_skills)
         
-        # Create REQUIRES_EXPERIENCE relationship - same as in create transaction
+        # The job title and its alternatives count as required experience, plus any explicit experiences
+        experience_params = []
         if job_title and total_experience_years:
-            tx.run("""
-            MERGE (e:Experience {title: $job_title})
-            WITH e
-            MATCH (jp:JobPosting {id: $posting_id})
-            CREATE (jp)-[:REQUIRES_EXPERIENCE {years: $total_experience_years}]->(e)
-            """, {
-                "posting_id": role_id,
-                "job_title": job_title,
-                "total_experience_years": total_experience_years
-            })
-            
-            if alternative_titles:
-                for alt_title in [t.strip() for t in alternative_titles.split(",") if t.strip()]:
-                    tx.run("""
-                    MERGE (e:Experience {title: $alt_title})
-                    WITH e
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[:REQUIRES_EXPERIENCE {years: $total_experience_years}]->(e)
-                    """, {
-                        "posting_id": role_id,
-                        "alt_title": alt_title,
-                        "total_experience_years": total_experience_years
-                    })
-        
-        # Process required experiences explicitly defined
-        if required_experiences:
-            for exp in required_experiences:
-                if isinstance(exp, dict) and 'title' in exp and exp['title'].strip():
-                    exp_title = exp['title'].strip().lower()
-                    years = exp.get('years', 0)
-                    
-                    tx.run("""
-                    MERGE (e:Experience {title: $exp_title})
-                    WITH e
-                    MATCH (jp:JobPosting {id: $posting_id})
-                    CREATE (jp)-[:REQUIRES_EXPERIENCE {years: $years}]->(e)
-                    """, {
-                        "posting_id": role_id,
-                        "exp_title": exp_title,
-                        "years": years
-                    })
-        
-        # Add keywords
-        if keywords:
-            for keyword in [k.strip() for k in keywords.split(",") if k.strip()]:
-                tx.run("""
-                MERGE (k:Keyword {name: $keyword})
-                WITH k
-                MATCH (jp:JobPosting {id: $posting_id})
-                CREATE (jp)-[:HAS_KEYWORD]->(k)
-                """, {
-                    "posting_id": role_id,
-                    "keyword": keyword
-                })
+            experience_params.append({"title": job_title, "years": total_experience_years})
+            experience_params.extend(
+                {"title": alt_title, "years": total_experience_years}
+                for alt_title in _split_csv(alternative_titles)
+            )
+        experience_params.extend(
+            {"title": exp['title'].strip().lower(), "years": exp.get('years', 0)}
+            for exp in required_experiences or []
+            if isinstance(exp, dict) and 'title' in exp and exp['title'].strip()
+        )
         
-        return True
+        return {
+            "locations": [location_city.strip().lower()] if location_city and location_city.strip() else [],
+            "fields": field_params,
+            "alt_fields": alt_field_params,
+            "skills": skill_params,
+            "alt_skills": alt_skill_params,
+            "experiences": experience_params,
+            "keywords": _split_csv(keywords)
+        }
     
-    def _create_or_update_role_transaction(
-        self, 
-        tx: Transaction, 
-        role_id: str, 
-        job_title: str, 
-        alternative_titles: Optional[str] = None, 
-        degree_requirement: Optional[str] = None, 
-        fields_of_study: Optional[List[Dict[str, Any]]] = None, 
-        total_experience_years: int = 0, 
+    def _role_row(
+        self,
+        role_id: str,
+        job_title: str,
+        alternative_titles: Optional[str] = None,
+        degree_requirement: Optional[str] = None,
+        fields_of_study: Optional[List[Dict[str, Any]]] = None,
+        total_experience_years: int = 0,
         required_skills: Optional[List[Dict[str, Any]]] = None,
-        required_experiences: Optional[List[Dict[str, Any]]] = None,  # Added parameter
-        location_city: Optional[str] = None,  
-        remote_option: Optional[bool] = False, 
-        industry_sector: Optional[str] = None, 
+        required_experiences: Optional[List[Dict[str, Any]]] = None,
+        location_city: Optional[str] = None,
+        remote_option: Optional[bool] = False,
+        industry_sector: Optional[str] = None,
         role_level: Optional[str] = None,
         keywords: Optional[str] = None
-    ) -> bool:
+    ) -> Dict[str, Any]:
+        """Build one element of the $roles list consumed by _UPSERT_ROLES from add_role-style arguments"""
+        return {
+            "posting_id": role_id,
+            "props": self._role_properties(
+                job_title, alternative_titles, degree_requirement, total_experience_years,
+                remote_option, industry_sector, role_level, keywords
+            ),
+            **self._role_relationship_params(
+                job_title, alternative_titles, fields_of_study, total_experience_years,
+                required_skills, required_experiences, location_city, keywords
+            )
+        }
+    
+    def delete_role(self, role_id: str) -> bool:
         """
-        Create a new role or update an existing one in Neo4j
+        Delete a role and all its relationships
         
-        This function checks if the role exists and delegates to the appropriate
-        create or update transaction method.
+        Args:
+            role_id: ID of the role to delete
+            
+        Returns:
+            bool: True if the role was found and deleted, False otherwise
         """
-        # Check if the job posting already exists
-        check_result = tx.run(
-            "MATCH (j:JobPosting {id: $posting_id}) RETURN count(j) as count",
-            {"posting_id": role_id}
-        ).single()
+        return self.delete_roles([role_id]) > 0
+    
+    def delete_roles(self, role_ids: List[str]) -> int:
+        """
+        Delete several roles and all their relationships in one round trip
         
-        # Determine whether to create or update
-        if check_result and check_result["count"] > 0:
-            # Role exists, update it
-            logger.info(f"Updating existing role with ID {role_id}")
-            return self._update_role_transaction(
-                tx, 
-                role_id, 
-                job_title,
-                alternative_titles,
-                degree_requirement,
-                fields_of_study,
-                total_experience_years,
-                required_skills,
-                required_experiences,  # Added parameter
-                location_city,  
-                remote_option,
-                industry_sector,
-                role_level,
-                keywords
-            )
-        else:
-            # Role doesn't exist, create it
-            logger.info(f"Creating new role with ID {role_id}")
-            return self._create_role_transaction(
-                tx, 
-                role_id, 
-                job_title,
-                alternative_titles,
-                degree_requirement,
-                fields_of_study,
-                total_experience_years,
-                required_skills,
-                required_experiences,  # Added parameter
-                location_city,  
-                remote_option,
-                industry_sector,
-                role_level,
-                keywords
-            )
+        Args:
+            role_ids: IDs of the roles to delete
+            
+        Returns:
+            int: Number of roles deleted (0 when none matched or on error)
+        """
+        if not role_ids:
+            return 0
+        if not self.connect():
+            logger.warning("Cannot connect to Neo4j to delete roles")
+            return 0
+        
+        try:
+            with self._session(WRITE_ACCESS) as session:
+                deleted = session.execute_write(self._delete_roles_transaction, role_ids)
+            self.invalidate_roles_cache()
+            if deleted < len(role_ids):
+                logger.warning(f"Deleted {deleted} of {len(role_ids)} requested roles, the rest were not found")
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting roles: {e}")
+            return 0
+    
+    def _delete_roles_transaction(self, tx: Transaction, role_ids: List[str]) -> int:
+        """Delete roles and all their relationships in Neo4j, returning the number of deleted roles"""
+        # Delete the job postings and all relationships
+        return tx.run(_DELETE_ROLES, {"role_ids": role_ids}).single()["deleted"]
         
     def add_candidate(
         self,
@@ -757,238 +862,184 @@ class Neo4jService:
         experiences: ResponseExperiences,
         skills: ResponseSkills
     ) -> bool:
-        logger.info(f"Attempting to add candidate with metadata: {person_data}")
+        """
+        Add a candidate with all its relationships in a single write transaction
+        
+        Args:
+            candidate_id: Unique identifier for the candidate
+            person_data: Person data with CV metadata
+            experiences: Extracted work experiences
+            skills: Extracted skills
+            
+        Returns:
+            True if added successfully, False otherwise
+        """
+        logger.info(f"Attempting to add candidate {candidate_id} from {getattr(person_data, 'cv_file_address', None)}")
 
         if not self.connect():
             return False
         
         try:
-            with self.driver.session() as session:
-                session.execute_write(
-                    self._create_candidate_transaction,
-                    candidate_id,
-                    person_data,
-                    experiences,
-                    skills
-                )
+            # One session, one transaction and one statement per CV; a failure leaves nothing half-written
+            row = self._candidate_params(candidate_id, person_data, experiences, skills)
+            with self._session(WRITE_ACCESS) as session:
+                session.execute_write(self._create_candidates_transaction, [row])
+            self.invalidate_candidates_cache()
             return True
         except Exception as e:
             logger.error(f"Error adding candidate: {e}")
             return False
-    
-    def delete_role(self, role_id: str) -> bool:
+        
+    def add_candidates(self, candidates: List[Dict[str, Any]]) -> List[bool]:
         """
-        Delete a role and all its relationships
+        Add many candidates in batches, one UNWIND statement and transaction per batch
+        
+        Batches of NEO4J_INGEST_BATCH_SIZE candidates are written concurrently; the driver is
+        thread-safe while sessions are not, so every worker thread uses its own session from
+        the shared connection pool.
         
         Args:
-            role_id: ID of the role to delete
+            candidates: List of keyword-argument dictionaries for add_candidate
             
         Returns:
-            bool: True if deleted successfully, False otherwise
+            List of success flags, in the same order as the input
         """
+        if not candidates:
+            return []
         if not self.connect():
-            logger.warning("Cannot connect to Neo4j to delete role")
-            return False
+            return [False] * len(candidates)
         
+        batch_size = max(1, int(os.getenv("NEO4J_INGEST_BATCH_SIZE", "100")))
+        batches = [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+        
+        # More workers than pooled connections would only queue on connection acquisition
+        max_workers = min(
+            int(os.getenv("NEO4J_INGEST_WORKERS", "8")),
+            int(os.getenv("NEO4J_POOL_SIZE", "100")),
+            len(batches)
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._add_candidate_batch, batches))
+        
+        self.invalidate_candidates_cache()
+        return [success for batch_results in results for success in batch_results]
+    
+    def _add_candidate_batch(self, batch: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Write one batch of add_candidate keyword-argument dictionaries in a single transaction
+        
+        If the batch fails, its candidates are retried one by one so a single bad CV
+        does not fail the others.
+        """
         try:
-            with self.driver.session() as session:
-                session.execute_write(self._delete_role_transaction, role_id)
-            return True
+            rows = [self._candidate_params(**candidate) for candidate in batch]
+            with self._session(WRITE_ACCESS) as session:
+                created = session.execute_write(self._create_candidates_transaction, rows)
+            logger.info(f"Added batch of {created} candidates")
+            return [True] * len(batch)
         except Exception as e:
-            logger.error(f"Error deleting role: {e}")
-            return False
+            if len(batch) == 1:
+                logger.error(f"Error adding candidate: {e}")
+                return [False]
+            logger.warning(f"Batch of {len(batch)} candidates failed, adding them one by one: {e}")
+            return [self._add_candidate_safely(candidate) for candidate in batch]
     
-    def _delete_role_transaction(self, tx: Transaction, role_id: str) -> None:
-        """Delete a role and all its relationships in Neo4j"""
-        # Delete the job posting and all relationships
-        tx.run("""
-        MATCH (jp:JobPosting {id: $role_id})
-        DETACH DELETE jp
-        """, {"role_id": role_id})
-        
-    def add_candidate(
-        self,
-        candidate_id: str,
-        person_data: PersonEntityWithMetadata,
-        experiences: ResponseExperiences,
-        skills: ResponseSkills
-    ) -> bool:
-        logger.info(f"Attempting to add candidate with metadata: {person_data}")
-
-        if not self.connect():
-            return False
-        
+    def _add_candidate_safely(self, candidate: Dict[str, Any]) -> bool:
+        """Add one candidate of a failed batch, reporting any error as a failure instead of raising"""
         try:
-            with self.driver.session() as session:
-                session.execute_write(
-                    self._create_candidate_transaction,
-                    candidate_id,
-                    person_data,
-                    experiences,
-                    skills
-                )
-            return True
+            return self.add_candidate(**candidate)
         except Exception as e:
-            logger.error(f"Error adding candidate: {e}")
+            logger.error(f"Error adding candidate {candidate.get('candidate_id')}: {e}")
             return False
-        
-    def _create_candidate_transaction(
+    
+    def _create_candidates_transaction(self, tx: Transaction, rows: List[Dict[str, Any]]) -> int:
+        """Write every candidate row and its relationships with one UNWIND statement"""
+        return tx.run(_CREATE_CANDIDATES, {"candidates": rows}).single()["created"]
+    
+    def _candidate_params(
         self,
-        tx: Transaction,
         candidate_id: str,
         person_data: PersonEntityWithMetadata,
         experiences: ResponseExperiences,
         skills: ResponseSkills
-    ) -> bool:
-        
-        # Prepare all parameters for the first query
+    ) -> Dict[str, Any]:
+        """Build one element of the $candidates list consumed by _CREATE_CANDIDATES"""
+        # Prepare all parameters for the query in single comprehension passes;
+        # entries without a name are skipped along with their alternatives
         # Education parameters
-        education_params = []
-        alt_fields_params = []
-        for edu in person_data.has_degrees or []:
-            if edu.field_of_study and edu.field_of_study.strip():
-                education_params.append({
-                    "field": edu.field_of_study.lower(),
-                    "university": edu.university.lower() if edu.university else "",
-                    "degree": edu.degree or "",
-                    "year": edu.graduation_year or 0
-                })
-                
-                if edu.alternative_fields:
-                    for alt_field in edu.alternative_fields:
-                        if alt_field.strip():
-                            alt_fields_params.append({
-                                "main_field": edu.field_of_study.lower(),
-                                "alt_field": alt_field.lower()
-                            })
+        degrees = [edu for edu in person_data.has_degrees or [] if edu.field_of_study and edu.field_of_study.strip()]
+        education_params = [
+            {
+                "field": edu.field_of_study.lower(),
+                "university": edu.university.lower() if edu.university else "",
+                "degree": edu.degree or "",
+                "year": edu.graduation_year or 0
+            }
+            for edu in degrees
+        ]
+        alt_fields_params = _dedupe([
+            {"main_field": edu.field_of_study.lower(), "alt_field": alt_field.lower()}
+            for edu in degrees
+            for alt_field in edu.alternative_fields or []
+            if alt_field.strip() and alt_field.lower() != edu.field_of_study.lower()
+        ], "main_field", "alt_field")
         
         # Experience parameters
-        experience_params = []
-        alt_exp_params = []
-        for exp in experiences.experience or []:
-            if exp.job_title and exp.job_title.strip():
-                experience_params.append({
-                    "title": exp.job_title.lower(),
-                    "years": exp.experience_in_years or 0,
-                    "company": exp.company_name or "",
-                    "description": exp.description or ""
-                })
-                
-                if exp.alternative_job_titles:
-                    for alt in [t.strip() for t in exp.alternative_job_titles.split(",") if t.strip()]:
-                        alt_exp_params.append({
-                            "main_title": exp.job_title.lower(),
-                            "alt_title": alt.lower()
-                        })
+        positions = [exp for exp in experiences.experience or [] if exp.job_title and exp.job_title.strip()]
+        experience_params = _dedupe([
+            {
+                "title": exp.job_title.lower(),
+                "years": exp.experience_in_years or 0,
+                "company": exp.company_name or "",
+                "description": exp.description or ""
+            }
+            for exp in positions
+        ], "title", "company", "years", "description")
+        alt_exp_params = _dedupe([
+            {"main_title": exp.job_title.lower(), "alt_title": alt.lower()}
+            for exp in positions
+            for alt in _split_csv(exp.alternative_job_titles)
+            if alt.lower() != exp.job_title.lower()
+        ], "main_title", "alt_title")
         
         # Skill parameters
-        skill_params = []
-        alt_skill_params = []
-        for skill in skills.skills or []:
-            if skill.name and skill.name.strip():
-                skill_params.append({
-                    "name": skill.name.lower(),
-                    "level": skill.level or "beginner",
-                    "years": skill.years_experience or 0
-                })
-                
-                if skill.alternative_names:
-                    for alt in [n.strip() for n in skill.alternative_names.split(",") if n.strip()]:
-                        alt_skill_params.append({
-                            "main_skill": skill.name.lower(),
-                            "alt_skill": alt.lower()
-                        })
+        named_skills = [skill for skill in skills.skills or [] if skill.name and skill.name.strip()]
+        # A skill listed more than once (e.g. in several CV sections) is written once, with its most years
+        skills_by_name = {}
+        for skill in named_skills:
+            row = {
+                "name": skill.name.lower(),
+                "level": skill.level or "beginner",
+                "years": skill.years_experience or 0
+            }
+            current = skills_by_name.get(row["name"])
+            if current is None or row["years"] > current["years"]:
+                skills_by_name[row["name"]] = row
+        skill_params = list(skills_by_name.values())
+        alt_skill_params = _dedupe([
+            {"main_skill": skill.name.lower(), "alt_skill": alt.lower()}
+            for skill in named_skills
+            for alt in _split_csv(skill.alternative_names)
+            if alt.lower() != skill.name.lower()
+        ], "main_skill", "alt_skill")
         
-        # Execute the first query with all direct relationships
-        tx.run("""
-        MERGE (c:Candidate {id: $candidate_id})
-        SET c.name = $name,
-            c.job_title = $job_title,
-            c.description = $description,
-            c.cv_text = $cv_text,
-            c.cv_file_address = $cv_file_address,
-            c.created_at = datetime()
-    
-        // Location if provided
-        WITH c
-        FOREACH (loc IN CASE WHEN $location <> '' THEN [1] ELSE [] END |
-          MERGE (lc:LocationCity {name: $location})
-          MERGE (c)-[:FROM]->(lc)
-        )
-    
-        // Add all educational backgrounds
-        WITH c
-        UNWIND $education AS edu
-        MERGE (f:FieldOfStudy {name: edu.field})
-        MERGE (c)-[:HAS_FIELD_OF_STUDY {
-          university: edu.university,
-          degree: edu.degree,
-          graduation_year: edu.year
-        }]->(f)
-    
-        // Add all experiences
-        WITH c
-        UNWIND $experiences AS exp
-        MERGE (e:Experience {title: exp.title})
-        MERGE (c)-[:HAS_EXPERIENCE {
-          years: exp.years,
-          company: exp.company,
-          description: exp.description
-        }]->(e)
-    
-        // Add all skills
-        WITH c
-        UNWIND $skills AS skill
-        MERGE (s:Skill {name: skill.name})
-        MERGE (c)-[:HAS_SKILL {
-          level: skill.level,
-          years: skill.years
-        }]->(s)
-        """, {
+        return {
             "candidate_id": candidate_id,
-            "name": person_data.name,
-            "job_title": person_data.job_title,
-            "description": person_data.description,
-            "cv_text": person_data.cv_text,
-            "cv_file_address": person_data.cv_file_address,
+            "props": {
+                "name": person_data.name,
+                "job_title": person_data.job_title,
+                "description": person_data.description,
+                "cv_text": person_data.cv_text,
+                "cv_file_address": person_data.cv_file_address
+            },
             "location": person_data.location_city.strip().lower() if hasattr(person_data, 'location_city') and person_data.location_city else "",
             "education": education_params,
             "experiences": experience_params,
-            "skills": skill_params
-        })
-        
-        # Execute second query for all alternatives if needed
-        if alt_fields_params or alt_exp_params or alt_skill_params:
-            tx.run("""
-            // Process alternative fields
-            UNWIND $alt_fields AS alt
-            MERGE (af:FieldOfStudy {name: alt.alt_field})
-            WITH af, alt
-            MATCH (f:FieldOfStudy {name: alt.main_field})
-            MERGE (af)-[:ALTERNATIVE_OF]->(f)
-    
-            // Process alternative experiences
-            WITH 1 as dummy
-            UNWIND $alt_experiences AS alt_exp
-            MERGE (ae:Experience {title: alt_exp.alt_title})
-            WITH ae, alt_exp
-            MATCH (e:Experience {title: alt_exp.main_title})
-            MERGE (ae)-[:ALTERNATIVE_OF]->(e)
-    
-            // Process alternative skills
-            WITH 1 as dummy
-            UNWIND $alt_skills AS alt_skill
-            MERGE (as:Skill {name: alt_skill.alt_skill})
-            WITH as, alt_skill
-            MATCH (s:Skill {name: alt_skill.main_skill})
-            MERGE (as)-[:ALTERNATIVE_OF]->(s)
-            """, {
-                "alt_fields": alt_fields_params,
-                "alt_experiences": alt_exp_params,
-                "alt_skills": alt_skill_params
-            })
-        
-        return True
+            "skills": skill_params,
+            "alt_fields": alt_fields_params,
+            "alt_experiences": alt_exp_params,
+            "alt_skills": alt_skill_params
+        }
 
     def get_all_candidates(self) -> List[Dict[str, Any]]:
         """
@@ -997,31 +1048,31 @@ class Neo4jService:
         Returns:
             List of dictionaries containing candidate data
         """
+        with _CANDIDATES_CACHE_LOCK:
+            cached = _CANDIDATES_CACHE.get("candidates")
+        if cached is not None:
+            return list(cached)
+        
         if not self.connect():
             logger.warning("Cannot connect to Neo4j to fetch candidates")
             return []
         
-        query = """
-        MATCH (c:Candidate)
-        RETURN 
-            c.id as id,
-            c.name as name,
-            c.job_title as job_title,
-            c.description as description,
-            c.cv_file_address as file_path,
-            c.created_at as upload_date,
-            EXISTS((c)-[:HAS_SKILL]->()) as has_skills,
-            EXISTS((c)-[:HAS_EXPERIENCE]->()) as has_experience,
-            EXISTS((c)-[:HAS_FIELD_OF_STUDY]->()) as has_education
-        """
-        
         try:
-            result = self.run_query(query)
-            return result if result else []
+            result = self.run_read(_GET_ALL_CANDIDATES, transform=_post_process_candidate)
+            if result is None:
+                return []
+            with _CANDIDATES_CACHE_LOCK:
+                _CANDIDATES_CACHE["candidates"] = result
+            return list(result)
         except Exception as e:
             logger.error(f"Error fetching candidates: {e}")
             return []
 
+    def invalidate_candidates_cache(self) -> None:
+        """Drop the cached candidate list so the next get_all_candidates reads from Neo4j"""
+        with _CANDIDATES_CACHE_LOCK:
+            _CANDIDATES_CACHE.clear()
+
     def delete_candidate(self, candidate_id: str) -> tuple[str, bool]:
         """
         Delete a candidate and all their relationships
@@ -1030,31 +1081,25 @@ class Neo4jService:
             candidate_id: ID of the candidate to delete
             
         Returns:
-            bool: True if deleted successfully, False otherwise
+            tuple: (file path of the candidate's CV or None, success boolean)
         """
         if not self.connect():
             logger.warning("Cannot connect to Neo4j to delete candidate")
-            return False
-        
-        # First get the file path before deleting
-        query_file_path = """
-        MATCH (c:Candidate {id: $candidate_id})
-        RETURN c.cv_file_address as file_path
-        """
+            return None, False
         
+        # Read the file path and delete the candidate with all relationships in one round trip
         try:
-            result = self.run_query(query_file_path, {"candidate_id": candidate_id})
-            file_path = result[0]["file_path"] if result and "file_path" in result[0] else None
-            
-            # Delete the candidate and all relationships using DETACH DELETE
-            delete_query = """
-            MATCH (c:Candidate {id: $candidate_id})
-            DETACH DELETE c
-            """
+            result = self.run_write_one(_DELETE_CANDIDATE, {"candidate_id": candidate_id})
+            if result is None:
+                return None, False
             
-            self.run_query(delete_query, {"candidate_id": candidate_id})
+            if not result["found"]:
+                # Nothing matched, so the candidate is already gone
+                logger.warning(f"Candidate {candidate_id} not found, nothing to delete")
+                return None, True
             
-            return file_path, True
+            self.invalidate_candidates_cache()
+            return result["file_path"], True
         except Exception as e:
             logger.error(f"Error deleting candidate: {e}")
             return None, False
@@ -1070,25 +1115,34 @@ class Neo4jService:
             logger.warning("Cannot connect to Neo4j to delete all candidates")
             return [], False
         
-        # First get all file paths
-        query_file_paths = """
-        MATCH (c:Candidate)
-        RETURN c.cv_file_address as file_path
-        """
-        
+        # Collect the file paths and delete all candidates with their relationships in one round trip.
+        # CALL ... IN TRANSACTIONS commits its own batches, so it must run as an auto-commit query.
         try:
-            result = self.run_query(query_file_paths)
-            file_paths = [r["file_path"] for r in result if r.get("file_path")]
-            
-            # Delete all candidates and relationships using DETACH DELETE
-            delete_query = """
-            MATCH (c:Candidate)
-            DETACH DELETE c
-            """
-            
-            self.run_query(delete_query)
+            with self._session(WRITE_ACCESS) as session:
+                record = session.run(_DELETE_ALL_CANDIDATES).single()
+            self.invalidate_candidates_cache()
             
+            file_paths = [path for path in record["file_paths"] if path] if record else []
+            logger.info(f"Deleted {len(record['file_paths']) if record else 0} candidates")
             return file_paths, True
         except Exception as e:
             logger.error(f"Error deleting all candidates: {e}")
-            return [], False
\ No newline at end of file
+            return [], False
+
+    def find_matching_candidates(self, role_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank the candidates sharing skills with a role
+        
+        Args:
+            role_id: ID of the role to match against
+            limit: Maximum number of candidates to return
+            
+        Returns:
+            List of dictionaries with id, name, job_title, score and matched_skills, best match first
+        """
+        if not self.connect():
+            logger.warning("Cannot connect to Neo4j to match candidates")
+            return []
+        
+        result = self.run_read(_FIND_MATCHING_CANDIDATES, {"role_id": role_id, "limit": int(limit)})
+        return result if result else []
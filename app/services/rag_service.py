@@ -5,8 +5,44 @@ from langchain_neo4j import GraphCypherQAChain, Neo4jGraph
 from langchain_openai import AzureChatOpenAI
 from langchain_core.prompts.prompt import PromptTemplate
 
-# Load environment variables
-load_dotenv()
+# Load environment variables unless the deployment injects them directly
+if not os.getenv("SKIP_DOTENV"):
+    load_dotenv()
+
+# Cypher generation template with resume matching examples; built once at import
+_CYPHER_GENERATION_TEMPLATE = """Task: Generate Cypher statement to query a graph database.
+
+Instructions:
+Use only the provided relationship types and properties in the schema.
+Do not use any other relationship types or properties that are not provided.
+
+Schema:
+{schema}
+
+Examples:
+# Find candidates with Python skills
+MATCH (p:Person)-[r:HAS_SKILL]->(s:Skill) 
+WHERE s.name = "Python" 
+RETURN p.name, p.role, p.years_experience
+
+# Find candidates with at least bachelor's degree in Computer Science
+MATCH (p:Person)-[:HAS_EDUCATION]->(e:Education)
+WHERE e.field_of_study CONTAINS "Computer Science" 
+AND (e.degree CONTAINS "Bachelor" OR e.degree CONTAINS "Master" OR e.degree CONTAINS "PhD")
+RETURN p.name, p.role, e.degree, e.university
+
+Note: Do not include any explanations or apologies in your responses.
+Do not respond to any questions that might ask anything else than for you to construct a Cypher statement.
+Do not include any text except the generated Cypher statement.
+
+The question is:
+{question}
+"""
+
+_CYPHER_GENERATION_PROMPT = PromptTemplate(
+    input_variables=["schema", "question"],
+    template=_CYPHER_GENERATION_TEMPLATE
+)
 
 class RAGService:
     def __init__(self):
@@ -24,6 +60,7 @@ class RAGService:
             url=os.getenv("NEO4J_URI"),
             username=os.getenv("NEO4J_USERNAME"),
             password=os.getenv("NEO4J_PASSWORD"),
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
             enhanced_schema=True,
         )
         
@@ -34,46 +71,11 @@ class RAGService:
         self._setup_cypher_chain()
     
     def _setup_cypher_chain(self):
-        # Cypher generation template with resume matching examples
-        CYPHER_GENERATION_TEMPLATE = """Task: Generate Cypher statement to query a graph database.
-        
-        Instructions:
-        Use only the provided relationship types and properties in the schema.
-        Do not use any other relationship types or properties that are not provided.
-        
-        Schema:
-        {schema}
-        
-        Examples:
-        # Find candidates with Python skills
-        MATCH (p:Person)-[r:HAS_SKILL]->(s:Skill) 
-        WHERE s.name = "Python" 
-        RETURN p.name, p.role, p.years_experience
-        
-        # Find candidates with at least bachelor's degree in Computer Science
-        MATCH (p:Person)-[:HAS_EDUCATION]->(e:Education)
-        WHERE e.field_of_study CONTAINS "Computer Science" 
-        AND (e.degree CONTAINS "Bachelor" OR e.degree CONTAINS "Master" OR e.degree CONTAINS "PhD")
-        RETURN p.name, p.role, e.degree, e.university
-        
-        Note: Do not include any explanations or apologies in your responses.
-        Do not respond to any questions that might ask anything else than for you to construct a Cypher statement.
-        Do not include any text except the generated Cypher statement.
-        
-        The question is:
-        {question}
-        """
-        
-        CYPHER_GENERATION_PROMPT = PromptTemplate(
-            input_variables=["schema", "question"], 
-            template=CYPHER_GENERATION_TEMPLATE
-        )
-        
         # Configure chain to provide natural language responses
         self.chain = GraphCypherQAChain.from_llm(
             llm=self.llm,
             graph=self.graph,
-            cypher_prompt=CYPHER_GENERATION_PROMPT,
+            cypher_prompt=_CYPHER_GENERATION_PROMPT,
             validate_cypher=True,
             return_intermediate_steps=True,
             return_direct=True,  # Process results with LLM
@@ -318,6 +318,14 @@ def prepare_edit_form(role):
         st.session_state.remote_option = role['remote_option'] == 'true' if isinstance(role['remote_option'], str) else bool(role['remote_option'])
 
 
+async def extract_job_data(data_extraction_service, text_content):
+    """Extract job posting data, closing the Azure connections before asyncio.run closes the loop"""
+    try:
+        return await data_extraction_service.extract_job_posting_information_for_form(text_content)
+    finally:
+        await data_extraction_service.aclose()
+
+
 def add_role_form(neo4j_service):
     """Form for adding a new role or editing an existing one"""
     data_extraction_service = DataExtractionService()
@@ -346,7 +354,7 @@ def add_role_form(neo4j_service):
                 
                 if text_content:
                     # Extract job data from the text
-                    job_data = asyncio.run(data_extraction_service.extract_job_posting_information_for_form(text_content))
+                    job_data = asyncio.run(extract_job_data(data_extraction_service, text_content))
                     
                     if job_data:
                         st.success("Data extracted successfully! Form pre-filled with extracted information.")
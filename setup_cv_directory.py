@@ -13,7 +13,8 @@ def setup_directories():
     directories = [
         "data",
         "data/cvs",
-        "data/temp"
+        "data/temp",
+        "data/extraction_cache"
     ]
     
     # Create each directory if it doesn't exist
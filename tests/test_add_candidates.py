@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+
+import pytest
+
+neo4j_service = pytest.importorskip("app.services.neo4j_service")
+models = pytest.importorskip("app.pyd_models.models")
+
+
+class _FakeSession:
+    """Session stand-in recording the Cypher parameters of every write transaction"""
+
+    def __init__(self, written):
+        self.written = written
+
+    def execute_write(self, transaction, rows):
+        self.written.extend(rows)
+        return len(rows)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A Neo4jService whose sessions record the rows they would write instead of reaching a database"""
+    service = neo4j_service.Neo4jService()
+    service.driver = object()  # connect() is a no-op once a driver is set
+    service.written = []
+
+    @contextmanager
+    def session(access_mode):
+        yield _FakeSession(service.written)
+
+    monkeypatch.setattr(service, "_session", session)
+    return service
+
+
+def _candidate(candidate_id):
+    return {
+        "candidate_id": candidate_id,
+        "person_data": models.PersonEntityWithMetadata(
+            id=f"person_{candidate_id}", name=candidate_id, has_degrees=[], cv_file_address=f"{candidate_id}.pdf"
+        ),
+        "experiences": models.ResponseExperiences(
+            experience=[models.ExperienceEntity(job_title="Engineer", company_name="acme", experience_in_years=2)]
+        ),
+        "skills": models.ResponseSkills(skills=[models.SkillEntity(name="Python", years_experience=3)]),
+    }
+
+
+def _written_ids(service):
+    return [row["candidate_id"] for row in service.written]
+
+
+def test_add_candidates_writes_whole_batch(service):
+    assert service.add_candidates([_candidate("a"), _candidate("b")]) == [True, True]
+    assert _written_ids(service) == ["a", "b"]
+    assert service.written[0]["experiences"] == [{"title": "engineer", "years": 2, "company": "acme", "description": ""}]
+    assert service.written[0]["skills"] == [{"name": "python", "level": "beginner", "years": 3}]
+
+
+def test_add_candidates_mixed_batch_reports_each_candidate(service):
+    # No person data, so building its row fails inside add_candidate's own error handling
+    bad = {**_candidate("bad"), "person_data": None}
+
+    assert service.add_candidates([_candidate("good-1"), bad, _candidate("good-2")]) == [True, False, True]
+    assert _written_ids(service) == ["good-1", "good-2"]
+
+
+def test_add_candidates_malformed_dict_does_not_raise(service):
+    # A missing argument makes add_candidate itself raise during the one-by-one fallback
+    bad = _candidate("bad")
+    del bad["skills"]
+
+    assert service.add_candidates([_candidate("good-1"), bad, _candidate("good-2")]) == [True, False, True]
+    assert _written_ids(service) == ["good-1", "good-2"]
+
+
+def test_add_candidates_keeps_order_across_batches(service, monkeypatch):
+    monkeypatch.setenv("NEO4J_INGEST_BATCH_SIZE", "2")
+    bad = {**_candidate("2"), "person_data": None}
+
+    assert service.add_candidates([_candidate("1"), bad, _candidate("3"), _candidate("4")]) == [True, False, True, True]
+    assert sorted(_written_ids(service)) == ["1", "3", "4"]
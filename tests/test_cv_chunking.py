@@ -0,0 +1,132 @@
+import pytest
+
+data_extraction_service = pytest.importorskip("app.services.data_extraction_service")
+models = pytest.importorskip("app.pyd_models.models")
+
+split_cv_text = data_extraction_service.split_cv_text
+merge_cv_data = data_extraction_service.merge_cv_data
+
+
+class _WordEncoding:
+    """Tokenizer stand-in counting one token per whitespace-separated word"""
+
+    def encode(self, text):
+        return text.split()
+
+
+@pytest.fixture(autouse=True)
+def word_tokenizer(monkeypatch):
+    """Make token counts predictable and avoid downloading tiktoken encodings"""
+    monkeypatch.setattr(data_extraction_service.tiktoken, "encoding_for_model", lambda name: _WordEncoding())
+    monkeypatch.setattr(data_extraction_service.tiktoken, "get_encoding", lambda name: _WordEncoding())
+
+
+def _lines(count, words_per_line=2):
+    return "".join(" ".join(f"w{i}" for _ in range(words_per_line)) + "\n" for i in range(count))
+
+
+def test_text_within_budget_is_one_chunk():
+    text = _lines(3)
+    assert split_cv_text(text, "gpt-4o", max_tokens=6) == [text]
+
+
+def test_chunks_respect_budget_and_line_boundaries():
+    text = _lines(5)  # 10 tokens, 2 per line
+
+    chunks = split_cv_text(text, "gpt-4o", max_tokens=4)
+
+    assert chunks == [_lines(5)[0:12], _lines(5)[12:24], _lines(5)[24:]]
+    assert "".join(chunks) == text
+    assert all(chunk.endswith("\n") for chunk in chunks)
+
+
+def test_line_longer_than_budget_gets_its_own_chunk():
+    long_line = "a b c d e f\n"
+    text = "x y\n" + long_line + "z\n"
+
+    chunks = split_cv_text(text, "gpt-4o", max_tokens=3)
+
+    assert chunks == ["x y\n", long_line, "z\n"]
+
+
+def test_budget_defaults_to_env_var(monkeypatch):
+    monkeypatch.setenv("EXTRACTION_MAX_CHUNK_TOKENS", "4")
+
+    assert len(split_cv_text(_lines(4), "gpt-4o")) == 2
+
+
+def test_unknown_model_falls_back_to_default_encoding(monkeypatch):
+    def unknown_model(name):
+        raise KeyError(name)
+
+    monkeypatch.setattr(data_extraction_service.tiktoken, "encoding_for_model", unknown_model)
+
+    assert split_cv_text(_lines(4), "my-azure-deployment", max_tokens=4) == [_lines(4)[:12], _lines(4)[12:]]
+
+
+def _result(person=None, degrees=(), experiences=(), skills=()):
+    return models.ResponseCVData(
+        person=models.PersonEntity(**{"id": None, "name": None, **(person or {})}, has_degrees=list(degrees)),
+        experiences=models.ResponseExperiences(experience=list(experiences)),
+        skills=models.ResponseSkills(skills=list(skills)),
+    )
+
+
+def test_merge_fills_person_fields_from_later_chunks():
+    first = _result(person={"job_title": "data engineer"})
+    second = _result(person={"id": "person_jane", "name": "jane", "job_title": "ignored", "location_city": "paris"})
+
+    person = merge_cv_data([first, second]).person
+
+    assert (person.id, person.name, person.job_title, person.location_city) == (
+        "person_jane", "jane", "data engineer", "paris"
+    )
+
+
+def test_merge_does_not_modify_first_chunk():
+    first = _result()
+    merge_cv_data([first, _result(person={"name": "jane"})])
+
+    assert first.person.name is None
+
+
+def test_merge_deduplicates_experiences_by_title_and_company():
+    experience = models.ExperienceEntity
+    merged = merge_cv_data([
+        _result(experiences=[experience(job_title="Engineer", company_name="Acme")]),
+        _result(experiences=[
+            experience(job_title=" engineer ", company_name="ACME"),
+            experience(job_title="Engineer", company_name="Globex"),
+        ]),
+    ])
+
+    assert [(e.job_title, e.company_name) for e in merged.experiences.experience] == [
+        ("Engineer", "Acme"), ("Engineer", "Globex")
+    ]
+
+
+def test_merge_keeps_skill_with_most_years():
+    skill = models.SkillEntity
+    merged = merge_cv_data([
+        _result(skills=[skill(name="Python", years_experience=2), skill(name="SQL", years_experience=3)]),
+        _result(skills=[skill(name=" python", years_experience=5), skill(name="sql", years_experience=1)]),
+    ])
+
+    assert sorted((s.name.strip().lower(), s.years_experience) for s in merged.skills.skills) == [
+        ("python", 5), ("sql", 3)
+    ]
+
+
+def test_merge_deduplicates_degrees():
+    degree = models.EducationEntity
+    merged = merge_cv_data([
+        _result(degrees=[degree(university="mit", degree="master", field_of_study="Computer Science", graduation_year=2015)]),
+        _result(degrees=[
+            degree(university="mit", degree="master", field_of_study="computer science ", graduation_year=2015),
+            degree(university="mit", degree="bachelor", field_of_study="computer science", graduation_year=2013),
+        ]),
+    ])
+
+    assert [(d.degree, d.field_of_study) for d in merged.person.has_degrees] == [
+        ("master", "Computer Science"), ("bachelor", "computer science")
+    ]
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+data_extraction_service = pytest.importorskip("app.services.data_extraction_service")
+models = pytest.importorskip("app.pyd_models.models")
+extraction_cache = data_extraction_service.extraction_cache
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """A DataExtractionService with a temporary cache whose model extraction is recorded"""
+    monkeypatch.setenv("SKIP_DOTENV", "1")
+    monkeypatch.delenv("EXTRACTION_NO_CACHE", raising=False)
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_DIR", str(tmp_path / "extraction_cache"))
+    service = data_extraction_service.DataExtractionService()
+    service.extracted = []
+
+    async def extract_cv_chunks(cleaned_text):
+        service.extracted.append(cleaned_text)
+        return models.ResponseCVData(person=models.PersonEntity(id="person_jane", name="jane", has_degrees=[]))
+
+    monkeypatch.setattr(service, "_extract_cv_chunks", extract_cv_chunks)
+    return service
+
+
+def _cache_key(service, cv_text):
+    return extraction_cache.make_key(
+        service.deployment, data_extraction_service._CV_SCHEMA_TAG, service.cv_sys.content, cv_text
+    )
+
+
+def test_valid_cached_entry_skips_extraction(service):
+    asyncio.run(service.extract_cv_data("cv text", "jane.pdf"))
+    result = asyncio.run(service.extract_cv_data("cv text", "jane.pdf"))
+
+    assert service.extracted == ["cv text"]
+    assert result["person"].name == "jane"
+
+
+def test_invalid_cached_entry_is_a_miss(service):
+    # An entry written for an older schema: person is missing entirely
+    extraction_cache.set(_cache_key(service, "cv text"), {"candidate": {"name": "jane"}})
+
+    result = asyncio.run(service.extract_cv_data("cv text", "jane.pdf"))
+
+    assert "extraction_failed" not in result
+    assert service.extracted == ["cv text"]
+    assert extraction_cache.get(_cache_key(service, "cv text"))["person"]["name"] == "jane"
+
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+data_extraction_service = pytest.importorskip("app.services.data_extraction_service")
+models = pytest.importorskip("app.pyd_models.models")
+messages = pytest.importorskip("langchain_core.messages")
+openai_tools = pytest.importorskip("langchain_core.output_parsers.openai_tools")
+
+
+def _response(name, finish_reason="tool_calls"):
+    return messages.AIMessage(
+        content="",
+        tool_calls=[{"name": "ResponseCVData", "args": {"person": {"id": None, "name": name, "has_degrees": []}}, "id": "call_1"}],
+        response_metadata={"finish_reason": finish_reason},
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A DataExtractionService answering from a scripted list of model responses"""
+    monkeypatch.setenv("SKIP_DOTENV", "1")
+    monkeypatch.setattr(data_extraction_service, "_create_clients", lambda: [])
+    service = data_extraction_service.DataExtractionService()
+    service.responses = []
+    service.calls = []
+
+    async def call_llm(model, sent):
+        service.calls.append(sent)
+        return service.responses.pop(0)
+
+    async def no_sleep(delay):
+        pass
+
+    parser = openai_tools.PydanticToolsParser(tools=[models.ResponseCVData], first_tool_only=True)
+    monkeypatch.setattr(service, "_bind_schema", lambda schema: ([object()], parser))
+    monkeypatch.setattr(service, "_call_llm", call_llm)
+    monkeypatch.setattr(data_extraction_service.asyncio, "sleep", no_sleep)
+    return service
+
+
+def _extract(service):
+    return asyncio.run(service.extract_entities(service.cv_sys, "cv text", models.ResponseCVData))
+
+
+def test_complete_response_is_accepted(service):
+    service.responses = [_response("jane")]
+
+    assert _extract(service).person.name == "jane"
+    assert len(service.calls) == 1
+
+
+def test_truncated_response_is_retried(service):
+    service.responses = [_response("ja", finish_reason="length"), _response("jane")]
+
+    assert _extract(service).person.name == "jane"
+    assert len(service.calls) == 2
+    assert "truncated" in service.calls[1][-1].content
+
+
+def test_truncated_responses_fail_extraction(service):
+    service.responses = [_response("ja", finish_reason="length")] * (data_extraction_service._MAX_VALIDATION_RETRIES + 1)
+
+    assert _extract(service) is None
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from app.services import extraction_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the extraction cache at a temporary directory"""
+    directory = tmp_path / "extraction_cache"
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_DIR", str(directory))
+    return directory
+
+
+@pytest.mark.parametrize("value, enabled", [
+    (None, True),
+    ("", True),
+    ("0", True),
+    ("1", False),
+    ("true", False),
+    ("TRUE", False),
+    ("yes", False),
+])
+def test_is_enabled_follows_no_cache_switch(monkeypatch, value, enabled):
+    if value is None:
+        monkeypatch.delenv("EXTRACTION_NO_CACHE", raising=False)
+    else:
+        monkeypatch.setenv("EXTRACTION_NO_CACHE", value)
+    assert extraction_cache.is_enabled() is enabled
+
+
+def test_make_key_is_deterministic():
+    assert extraction_cache.make_key("gpt-4o", "prompt", "cv") == extraction_cache.make_key("gpt-4o", "prompt", "cv")
+
+
+def test_make_key_keeps_part_boundaries():
+    # Parts are NUL-joined, so moving text between parts changes the key
+    assert extraction_cache.make_key("ab", "c") != extraction_cache.make_key("a", "bc")
+
+
+def test_get_returns_none_on_miss(cache_dir):
+    assert extraction_cache.get(extraction_cache.make_key("missing")) is None
+
+
+def test_set_then_get_round_trips(cache_dir):
+    key = extraction_cache.make_key("deployment", "prompt", "cv text")
+    value = {"person": {"name": "jane doe"}, "skills": {"skills": [{"name": "python"}]}}
+
+    extraction_cache.set(key, value)
+
+    assert extraction_cache.get(key) == value
+
+
+def test_get_ignores_unreadable_entry(cache_dir):
+    key = extraction_cache.make_key("corrupt")
+    cache_dir.mkdir()
+    (cache_dir / f"{key}.json").write_text("{not json", encoding="utf-8")
+
+    assert extraction_cache.get(key) is None
+
+
+def test_set_leaves_no_temporary_file(cache_dir):
+    key = extraction_cache.make_key("tmp")
+
+    extraction_cache.set(key, {"a": 1})
+
+    assert os.listdir(cache_dir) == [f"{key}.json"]
+
+
+def test_failed_set_keeps_previous_entry(cache_dir):
+    key = extraction_cache.make_key("atomic")
+    extraction_cache.set(key, {"version": 1})
+
+    # Not JSON-serializable, so the write fails part-way through the temporary file
+    extraction_cache.set(key, {"version": 2, "bad": object()})
+
+    assert extraction_cache.get(key) == {"version": 1}
+    assert os.listdir(cache_dir) == [f"{key}.json"]
+    with open(cache_dir / f"{key}.json", encoding="utf-8") as f:
+        assert json.load(f) == {"version": 1}